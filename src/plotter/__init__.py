@@ -1,15 +1,88 @@
-from .dataset import dataset  # NOQA
-from .dataset import sumOfWeightHelper  # NOQA
-from .collection import collection, SuperCollection  # NOQA
-from .collection import normalizationHelper  # NOQA
-from .histo import histo  # NOQA
-from .pad import pad  # NOQA
-from .canvas import canvas  # NOQA
-from .legend import legend  # NOQA
-from .xsReader import xsReader  # NOQA
-from . import presets  # NOQA
-from . import loader  # NOQA
-from . import atlas  # NOQA
-from . import thHelper  # NOQA
-from .quiet import Quiet  # NOQA
-from .tfile2 import TFile2  # NOQA
+""" Package namespace with lazily imported members
+
+Submodules are imported on the first access of their members,
+so e.g. `plotter.xsReader` or `plotter.loader` can be used
+without the (slow) import of ROOT, which is needed only
+by the ROOT-backed classes.
+"""
+
+import importlib
+import sys
+import types
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .dataset import dataset  # NOQA
+    from .dataset import sumOfWeightHelper  # NOQA
+    from .collection import collection, SuperCollection  # NOQA
+    from .collection import normalizationHelper  # NOQA
+    from .histo import histo  # NOQA
+    from .pad import pad  # NOQA
+    from .canvas import canvas  # NOQA
+    from .legend import legend  # NOQA
+    from .xsReader import xsReader  # NOQA
+    from . import presets  # NOQA
+    from . import loader  # NOQA
+    from . import atlas  # NOQA
+    from . import thHelper  # NOQA
+    from .quiet import Quiet  # NOQA
+    from .tfile2 import TFile2  # NOQA
+    from .filepool import TFilePool  # NOQA
+    from .keyindex import KeyIndex  # NOQA
+    from .npbackend import NumpyHist, NumpyGraph  # NOQA
+    from .resultcache import ResultCache  # NOQA
+
+# name -> (submodule, attribute of the submodule or None for the submodule)
+_MEMBERS: Dict[str, Tuple[str, Optional[str]]] = {
+    "dataset": (".dataset", "dataset"),
+    "sumOfWeightHelper": (".dataset", "sumOfWeightHelper"),
+    "collection": (".collection", "collection"),
+    "SuperCollection": (".collection", "SuperCollection"),
+    "normalizationHelper": (".collection", "normalizationHelper"),
+    "histo": (".histo", "histo"),
+    "pad": (".pad", "pad"),
+    "canvas": (".canvas", "canvas"),
+    "legend": (".legend", "legend"),
+    "xsReader": (".xsReader", "xsReader"),
+    "presets": (".presets", None),
+    "loader": (".loader", None),
+    "atlas": (".atlas", None),
+    "thHelper": (".thHelper", None),
+    "Quiet": (".quiet", "Quiet"),
+    "TFile2": (".tfile2", "TFile2"),
+    "TFilePool": (".filepool", "TFilePool"),
+    "KeyIndex": (".keyindex", "KeyIndex"),
+    "NumpyHist": (".npbackend", "NumpyHist"),
+    "NumpyGraph": (".npbackend", "NumpyGraph"),
+    "ResultCache": (".resultcache", "ResultCache"),
+}
+
+__all__ = list(_MEMBERS)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _MEMBERS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    moduleName, attribute = _MEMBERS[name]
+    member = importlib.import_module(moduleName, __name__)
+    if attribute is not None:
+        member = getattr(member, attribute)
+    globals()[name] = member
+    return member
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_MEMBERS))
+
+
+class _Package(types.ModuleType):
+    def __setattr__(self, name: str, value: Any) -> None:
+        # import of e.g. plotter.histo sets the submodule as attribute
+        # of the package, it must not hide the class of the same name
+        if isinstance(value, types.ModuleType) and name in _MEMBERS:
+            if _MEMBERS[name][1] is not None:
+                return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
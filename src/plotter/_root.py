@@ -0,0 +1,12 @@
+""" ROOT import with global settings of the package
+
+ROOT-backed modules import ROOT from here, so the settings are
+applied whenever ROOT is first needed, not on `import plotter`.
+"""
+
+import ROOT
+
+# no graphics windows, plots are only saved
+ROOT.gROOT.SetBatch(True)
+# histograms are not owned by the current directory
+ROOT.TH1.AddDirectory(False)
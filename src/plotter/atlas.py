@@ -1,13 +1,11 @@
 from ROOT import TStyle, TROOT
-import ROOT
+from ._root import ROOT
 from typing import Dict
 
 import logging
 
 log = logging.getLogger(__name__)
 
-ROOT.gROOT.SetBatch(True)
-
 def SetAtlasStyle():
     """Sets custom ATLAS style, it is mostly based
     on the official one but contains some custom fixes
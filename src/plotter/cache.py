@@ -0,0 +1,61 @@
+import hashlib
+import os
+import tempfile
+from typing import Tuple
+
+import logging
+
+log = logging.getLogger(__name__)
+
+""" Helpers for on-disk caches shared between jobs
+
+Cache files are stored in the directory given by the
+PLOTTER_CACHE_DIR environment variable, ~/.cache/plotter
+by default. Entries derived from input files are keyed by
+signature of the file (path, size and modification time),
+so they are invalidated when the file changes.
+"""
+
+
+def cache_dir() -> str:
+    """Returns directory for the cache files, creates it if needed"""
+    path = os.environ.get(
+        "PLOTTER_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "plotter")
+    )
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def cache_path(kind: str, key: str, suffix: str = ".json") -> str:
+    """Returns path of the cache file for given kind of cache and key
+
+    Arguments:
+        kind (``str``): kind of the cache, used as subdirectory
+        key (``str``): key of the entry, usually path of the input file
+        suffix (``str``): suffix of the cache file
+    """
+    directory = os.path.join(cache_dir(), kind)
+    os.makedirs(directory, exist_ok=True)
+    digest = hashlib.sha1(key.encode()).hexdigest()
+    return os.path.join(directory, digest + suffix)
+
+
+def file_signature(path: str) -> Tuple[str, int, int]:
+    """Returns (absolute path, size, mtime in ns) of the file"""
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """Writes data to the file through a temporary file,
+    so parallel jobs never read partially written cache.
+    """
+    directory = os.path.dirname(path)
+    fd, tmpPath = tempfile.mkstemp(dir=directory, prefix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmpPath, path)
+    except BaseException:
+        os.unlink(tmpPath)
+        raise
@@ -1,5 +1,5 @@
 from .pad import pad
-import ROOT
+from ._root import ROOT
 from ROOT import TCanvas
 from typing import Dict
 import os
@@ -17,20 +17,44 @@ class canvas:
     (e.g. drawin pads)
     """
 
-    def __init__(self, name: str, width: int = 800, height: int = 800) -> None:
+    def __init__(
+        self, name: str, width: int = 800, height: int = 800, autoClose: bool = False
+    ) -> None:
         """
         Arguments:
             name (``str``): name of canvas, used also as title
             x (``int``): x width of the canvas
             y (``int``): y width of the canvas
+            autoClose (``bool``): if True, the canvas is closed after `save`
         """
 
         self.tcan = TCanvas("{0}_{1}".format(name, uuid()), name, width, height)
         # TODO: still not 100% convinced we need a Dict and not just List
         self.pads: Dict[str, pad] = {}
+        self.autoClose = autoClose
 
         ROOT.gStyle.SetErrorX(0.5)
 
+    def __enter__(self) -> "canvas":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes pads and deletes the TCanvas together with objects
+        drawn by the canvas (e.g. texts), so long batch jobs do not
+        accumulate them in ROOT global lists. The canvas cannot be
+        used afterwards, calling close again does nothing.
+        """
+        if not hasattr(self, "tcan"):
+            return
+        for p in self.pads.values():
+            p.close()
+        self.pads = {}
+        self.tcan.Close()
+        del self.tcan
+
     def cd(self):
         """cd() to the canvas"""
         self.tcan.cd()
@@ -70,6 +94,9 @@ class canvas:
             print(path)
         ROOT.gErrorIgnoreLevel = oldIgnore
 
+        if self.autoClose:
+            self.close()
+
     def add_text(
         self,
         text: str,
@@ -1,9 +1,20 @@
-from typing import Optional, List, Dict, Union
-from ROOT import TH1
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional, List, Dict, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
 from .dataset import dataset, sumOfWeightHelper
+from .filepool import TFilePool
+from .npbackend import NumpyGraph, NumpyHist, UprootFilePool, tree_sum
+from .resultcache import ResultCache, _copy
+from . import thHelper
 import copy
+import os
+import numpy as np
 import logging
 
+if TYPE_CHECKING:
+    from ROOT import TH1
+
 log = logging.getLogger(__name__)
 
 
@@ -36,6 +47,138 @@ class normalizationHelper:
         self.bySoW = normBySoW
 
 
+def _norm_to_one(th: TH1, histoName: str, title: str) -> None:
+    """Normalizes combined histogram by its integral"""
+    if th.Integral() == 0:
+        log.warning(
+            f"Histogram {histoName} from collection {title} has integral 0."
+        )
+        log.warning("Cannot normalize to one!")
+    else:
+        th.Scale(1.0 / th.Integral())
+
+
+def _without_toOne(norm: Optional[normalizationHelper]) -> Optional[normalizationHelper]:
+    """Returns copy of the normalization without normalization to one,
+    contributions have to be added first and normalized at the end."""
+    if norm is None or not norm.toOne:
+        return norm
+    norm_comp = copy.copy(norm)
+    norm_comp.toOne = False
+    return norm_comp
+
+
+def _norm_key(norm: Optional[normalizationHelper]) -> Optional[Tuple[bool, ...]]:
+    """Part of the result cache key describing the normalization"""
+    if norm is None:
+        return None
+    return (norm.toOne, norm.byLumi, norm.byXS, norm.bySoW)
+
+
+class _Accumulator:
+    """Weighted sum of histograms
+
+    The output buffer is the first added histogram if it is owned
+    by the accumulator (e.g. freshly read from a file), otherwise
+    its copy. Following histograms are added into it with their
+    weight and released right away.
+    """
+
+    def __init__(self) -> None:
+        self.th: Optional[TH1] = None
+        # TH1::Add with weight also weights number of entries,
+        # keep the plain sum as with scaling inputs (graphs have no entries)
+        self.entries = 0.0
+
+    def add(self, th: TH1, weight: float = 1.0, owned: bool = True) -> None:
+        """Adds histogram scaled by the weight
+
+        Arguments:
+            th (``TH1``): histogram to be added
+            weight (``float``): weight of the histogram
+            owned (``bool``): if True, the histogram is not used by
+                anyone else and can be modified and released
+        """
+        if th.InheritsFrom("TH1"):
+            self.entries += th.GetEntries()
+        if self.th is None:
+            self.th = th if owned else th.Clone()
+            if not isinstance(th, (NumpyHist, NumpyGraph)):
+                from ._root import ROOT
+
+                # clones and objects detached from their file
+                # are deleted only if owned by python
+                ROOT.SetOwnership(self.th, True)
+            if weight != 1:
+                self.th.Scale(weight)
+            return
+        self.th.Add(th, weight)
+        if owned and not isinstance(th, NumpyHist):
+            from ._root import ROOT
+
+            # detached from its file, nobody else would delete it
+            ROOT.SetOwnership(th, True)
+
+    def result(self) -> Optional[TH1]:
+        """Returns the sum, None if nothing was added"""
+        if self.th is not None and self.th.InheritsFrom("TH1"):
+            self.th.SetEntries(self.entries)
+        return self.th
+
+
+def _result_key(
+    col: Union["collection", "SuperCollection"],
+    histoName: str,
+    norm: Optional[normalizationHelper],
+    skipBad: bool,
+    binning: Optional[thHelper.BinningType] = None,
+    xrange: Optional[Tuple[float, float]] = None,
+) -> Tuple:
+    """Key of the combined histogram in the result cache,
+    scale factors of enclosing SuperCollections are not included
+    so the result is shared by all of them"""
+    return (
+        col.cache_key(),
+        histoName,
+        _norm_key(norm),
+        skipBad,
+        tuple(binning) if isinstance(binning, list) else binning,
+        None if xrange is None else tuple(xrange),
+    )
+
+
+def _apply_scale(
+    th: Optional[TH1], scale: float, norm: Optional[normalizationHelper]
+) -> Optional[TH1]:
+    """Scales combined histogram by the factor of enclosing SuperCollections,
+    which has no effect if the histogram is normalized to one"""
+    if th is not None and scale != 1 and not (norm is not None and norm.toOne):
+        th.Scale(scale)
+    return th
+
+
+def _init_merge_worker() -> None:
+    """Worker processes must not share files opened by the parent"""
+    dataset.pool = TFilePool(dataset.pool.maxOpen)
+    dataset.uprootPool = UprootFilePool(dataset.uprootPool.maxOpen)
+
+
+def _merge_partial(
+    col: "collection",
+    histoName: str,
+    norm: Optional[normalizationHelper],
+    skipBad: bool,
+    binning: Optional[thHelper.BinningType],
+    xrange: Optional[Tuple[float, float]],
+) -> Optional[NumpyHist]:
+    """Merges datasets of the collection in a worker process,
+    returns the partial sum as numpy arrays"""
+    th = col._merge(col.datasets, histoName, norm, skipBad, binning, xrange)
+    if th is None or isinstance(th, NumpyHist):
+        return th
+    return NumpyHist.from_th1(th)
+
+
 def get_normalizationHelper(config):
 
     if config == "none":
@@ -53,6 +196,12 @@ class collection:
     and correct normalization of individual
     and combined histogram."""
 
+    # smallest collection merged in parallel when requested
+    minParallelDatasets = 16
+
+    # combined histograms shared by all collections and SuperCollections
+    resultCache = ResultCache()
+
     # TODO: need to rethink how sumOfWeightHelper is handled
     # both within collection and dataset
     def __init__(
@@ -89,11 +238,26 @@ class collection:
     def get_datasets(self) -> List[dataset]:
         return self.datasets
 
+    def cache_key(self) -> Tuple:
+        """Describes content of the collection for the result cache"""
+        sow = None if self.sow is None else (self.sow.histoName, self.sow.histoBin)
+        return (
+            "collection",
+            sow,
+            self.scale_factor,
+            tuple((ds.path, ds.XS, ds.lumi, ds.backend) for ds in self.datasets),
+        )
+
     def get_th(
         self,
         histoName: str,
         norm: Optional[normalizationHelper] = None,
         skipBad: bool = False,
+        parallel: bool = False,
+        maxWorkers: Optional[int] = None,
+        binning: Optional[thHelper.BinningType] = None,
+        xrange: Optional[Tuple[float, float]] = None,
+        scale: float = 1.0,
     ) -> Optional[TH1]:
         """Gets histograms from all datasets
         and correctly combines and normalizes them
@@ -104,6 +268,19 @@ class collection:
                 collection, see normalizationHelper class for details
             skipBad (``bool``): if histogram or file does not exist,
                 or is corrupted, it is skipped instead of raising error
+            parallel (``bool``): if True, datasets are read and merged
+                in a pool of processes. Collections smaller than
+                `collection.minParallelDatasets` are merged serially.
+            maxWorkers (``int``): number of processes for parallel merge,
+                by default number of processors
+            binning (``Union[int, List[Union[float, tuple]]]``): binning
+                applied to histogram of each dataset before merging,
+                see histo.rebin, 1D only
+            xrange (``Tuple[float, float]``): x range applied to histogram
+                of each dataset before merging, contents outside of the range
+                are moved to under/overflow, 1D only
+            scale (``float``): additional scale factor, e.g. from SuperCollections,
+                applied to the combined histogram, which is cached without it
 
         Returns:
             Combined histogram (``TH1``)
@@ -112,56 +289,229 @@ class collection:
         if len(self.datasets) == 0:
             raise RuntimeError(f"Collection {self.title} is empty!\n Add datasets!")
 
-        collTH: Optional[TH1] = None
-        for ds in self.datasets:
-            dsTH = ds.get(histoName, skipBad)
-            if dsTH is None:
-                if not skipBad:
-                    log.error("Got bad histogram from the dataset.")
-                    raise RuntimeError
-                continue
-
-            if norm is not None:
-                self.norm_ds(dsTH, ds, norm)
-
-            if collTH:
-                collTH.Add(dsTH)
-            else:
-                collTH = dsTH
+        key = _result_key(self, histoName, norm, skipBad, binning, xrange)
+        cached = self.resultCache.get(key)
+        if cached is not None:
+            return _apply_scale(cached, scale, norm)
+
+        nWorkers = maxWorkers if maxWorkers else (os.cpu_count() or 1)
+        if parallel and nWorkers > 1 and len(self.datasets) >= self.minParallelDatasets:
+            collTH = self._merge_parallel(
+                histoName, norm, skipBad, nWorkers, binning, xrange
+            )
+        else:
+            collTH = self._merge(
+                self.datasets, histoName, norm, skipBad, binning, xrange
+            )
 
         if collTH is None:
             return None
 
         if norm is not None and norm.toOne:
-            if collTH.Integral() == 0:
-                log.warning(
-                    f"Histogram {histoName} from collection {self.title} has integral 0."
+            _norm_to_one(collTH, histoName, self.title)
+
+        self.resultCache.put(key, collTH)
+        return _apply_scale(collTH, scale, norm)
+
+    def _merge(
+        self,
+        datasets: List[dataset],
+        histoName: str,
+        norm: Optional[normalizationHelper],
+        skipBad: bool,
+        binning: Optional[thHelper.BinningType] = None,
+        xrange: Optional[Tuple[float, float]] = None,
+    ) -> Optional[TH1]:
+        """Adds normalized histograms of the datasets,
+        each scaled once by its weight"""
+        acc = _Accumulator()
+        for ds in datasets:
+            dsTH = self._get_ds_th(ds, histoName, skipBad, binning, xrange)
+            if dsTH is None:
+                continue
+            acc.add(dsTH, self.norm_weight(ds, norm))
+        return acc.result()
+
+    def _merge_parallel(
+        self,
+        histoName: str,
+        norm: Optional[normalizationHelper],
+        skipBad: bool,
+        nWorkers: int,
+        binning: Optional[thHelper.BinningType] = None,
+        xrange: Optional[Tuple[float, float]] = None,
+    ) -> Optional[TH1]:
+        """Same as _merge for all datasets, but the datasets
+        are split into contiguous shares merged in worker processes.
+        The first share is merged by this process, the partial sums
+        from workers are added in a tree and then into the first share.
+        """
+        size = -(-len(self.datasets) // (nWorkers + 1))
+        shares = [
+            self.datasets[i: i + size] for i in range(0, len(self.datasets), size)
+        ]
+        with ProcessPoolExecutor(
+            max_workers=nWorkers, initializer=_init_merge_worker
+        ) as executor:
+            futures = []
+            for share in shares[1:]:
+                part = collection(self.title, self.sow)
+                part.datasets = share
+                futures.append(
+                    executor.submit(
+                        _merge_partial, part, histoName, norm, skipBad, binning, xrange
+                    )
                 )
-                log.warning("Cannot normalize to one!")
-            else:
-                collTH.Scale(1.0 / collTH.Integral())
+            collTH = self._merge(shares[0], histoName, norm, skipBad, binning, xrange)
+            partials = [future.result() for future in futures]
 
+        total = tree_sum([p for p in partials if p is not None])
+        if total is None:
+            return collTH
+        if collTH is None:
+            if self.datasets[0].backend == "uproot":
+                return total
+            return total.to_th1()
+        if isinstance(collTH, NumpyHist):
+            collTH.Add(total)
+        else:
+            total.add_to_th1(collTH)
         return collTH
 
-    def norm_ds(self, th: TH1, ds: dataset, norm: normalizationHelper):
-        """Normalizes histogram from a dataset"""
+    def get_th_many(
+        self,
+        histoNames: List[str],
+        norm: Optional[normalizationHelper] = None,
+        skipBad: bool = False,
+        scale: float = 1.0,
+    ) -> Dict[str, Optional[TH1]]:
+        """Same as get_th but for several histograms at once.
+
+        Each dataset is visited only once and all requested histograms
+        are read from it in one pass, instead of walking all files
+        again for every histogram.
+
+        Arguments:
+            histoNames (``List[str]``): names/paths of histograms in given file
+            norm (``normalizationHelper``): defines normalization of the
+                collection, see normalizationHelper class for details
+            skipBad (``bool``): if histogram or file does not exist,
+                or is corrupted, it is skipped instead of raising error
+            scale (``float``): additional scale factor, see get_th
+
+        Returns:
+            Combined histograms (``Dict[str, TH1]``), None for histograms
+            not found in any dataset
+        """
 
+        if len(self.datasets) == 0:
+            raise RuntimeError(f"Collection {self.title} is empty!\n Add datasets!")
+
+        keys = {name: _result_key(self, name, norm, skipBad) for name in histoNames}
+        collTHs: Dict[str, Optional[TH1]] = {
+            name: self.resultCache.get(key) for name, key in keys.items()
+        }
+        missing = [name for name, th in collTHs.items() if th is None]
+
+        if missing:
+            read = self._read_many(missing, norm, skipBad)
+            for histoName, collTH in read.items():
+                if collTH is None:
+                    continue
+                if norm is not None and norm.toOne:
+                    _norm_to_one(collTH, histoName, self.title)
+                self.resultCache.put(keys[histoName], collTH)
+            collTHs.update(read)
+
+        return {name: _apply_scale(th, scale, norm) for name, th in collTHs.items()}
+
+    def _read_many(
+        self,
+        histoNames: List[str],
+        norm: Optional[normalizationHelper],
+        skipBad: bool,
+    ) -> Dict[str, Optional[TH1]]:
+        """Adds normalized histograms of all datasets, file by file"""
+        accs = {name: _Accumulator() for name in histoNames}
+        for ds in self.datasets:
+            weight: Optional[float] = None
+            for histoName, acc in accs.items():
+                dsTH = self._get_ds_th(ds, histoName, skipBad)
+                if dsTH is None:
+                    continue
+                if weight is None:
+                    weight = self.norm_weight(ds, norm)
+                acc.add(dsTH, weight)
+        return {name: acc.result() for name, acc in accs.items()}
+
+    def _get_ds_th(
+        self,
+        ds: dataset,
+        histoName: str,
+        skipBad: bool,
+        binning: Optional[thHelper.BinningType] = None,
+        xrange: Optional[Tuple[float, float]] = None,
+    ) -> Optional[TH1]:
+        """Gets histogram from a single dataset, rebinned if requested"""
+        dsTH = ds.get(histoName, skipBad)
+        if dsTH is None:
+            if not skipBad:
+                log.error("Got bad histogram from the dataset.")
+                raise RuntimeError
+            return None
+        if binning is None and xrange is None:
+            return dsTH
+
+        reduced = thHelper.reduce_binning(dsTH, binning, xrange)
+        if reduced is not dsTH and not isinstance(dsTH, NumpyHist):
+            from ._root import ROOT
+
+            # the full histogram is not needed anymore
+            ROOT.SetOwnership(dsTH, True)
+        return reduced
+
+    def norm_weight(self, ds: dataset, norm: Optional[normalizationHelper]) -> float:
+        """Returns weight of histograms from a dataset given by the normalization"""
+        weight = 1.0
+        if norm is None:
+            return weight
         if norm.byXS:
-            th.Scale(ds.XS)
+            weight *= ds.XS
         if norm.bySoW:
             if self.sow is None:
                 log.error(
                     "Trying to normalize by sum of weights,\n but none was provided!."
                 )
                 raise RuntimeError
-            th.Scale(1.0 / ds.get_sumOfWeights(self.sow))
+            weight /= ds.get_sumOfWeights(self.sow)
         if norm.byLumi:
-            th.Scale(ds.lumi)
+            weight *= ds.lumi
+        return weight
+
+    def norm_weights(
+        self, norm: Optional[normalizationHelper], scale: float = 1.0
+    ) -> np.ndarray:
+        """Returns weights of all datasets in the collection (in order
+        of `datasets`), so the combined histogram is a weighted sum of
+        the dataset histograms. Sums of weights of all datasets are read.
+
+        Arguments:
+            norm (``normalizationHelper``): normalization of the collection,
+                normalization to one is not included
+            scale (``float``): additional scale factor, e.g. from SuperCollections
+        """
+        return np.array([self.norm_weight(ds, norm) * scale for ds in self.datasets])
+
+    def norm_ds(self, th: TH1, ds: dataset, norm: normalizationHelper):
+        """Normalizes histogram from a dataset"""
+        th.Scale(self.norm_weight(ds, norm))
 
 
 class SuperCollection:
     """Holds set of collections or SuperCollections, necessary for scaling collections"""
 
+    resultCache = collection.resultCache
+
     def __init__(self, title: str, scale_factor: Optional[float] = 1):
         self.container: List[Union[collection, "SuperCollection"]] = []
 
@@ -175,11 +525,28 @@ class SuperCollection:
 
         self.container.append(col)
 
+    def _child_scale(self) -> float:
+        """Scale passed to the contained collections"""
+        return 1.0 if self.scale_factor is None else self.scale_factor
+
+    def cache_key(self) -> Tuple:
+        """Describes content of the SuperCollection for the result cache"""
+        return (
+            "SuperCollection",
+            self.scale_factor,
+            tuple(col.cache_key() for col in self.container),
+        )
+
     def get_th(
         self,
         histoName: str,
         norm: Optional[normalizationHelper] = None,
         skipBad: bool = False,
+        parallel: bool = False,
+        maxWorkers: Optional[int] = None,
+        binning: Optional[thHelper.BinningType] = None,
+        xrange: Optional[Tuple[float, float]] = None,
+        scale: float = 1.0,
     ) -> Optional[TH1]:
         """Gets histograms from all datasets
         and correctly combines and normalizes them
@@ -190,6 +557,14 @@ class SuperCollection:
                 collection, see normalizationHelper class for details
             skipBad (``bool``): if histogram or file does not exist,
                 or is corrupted, it is skipped instead of raising error
+            parallel (``bool``): if True, collections are merged in
+                parallel, see collection.get_th
+            maxWorkers (``int``): number of processes for parallel merge
+            binning (``Union[int, List[Union[float, tuple]]]``): binning
+                applied before merging, see collection.get_th
+            xrange (``Tuple[float, float]``): x range applied before merging,
+                see collection.get_th
+            scale (``float``): additional scale factor, see collection.get_th
 
         Returns:
             Combined histogram (``TH1``)
@@ -198,47 +573,232 @@ class SuperCollection:
         if len(self.container) == 0:
             raise RuntimeError(f"Collection {self.title} is empty!\n Add datasets!")
 
-        norm_orig = None
-        if norm:
-            norm_orig = copy.copy(norm)
-            if norm.toOne:
-                norm.toOne = (
-                    False  # need to first add contributions, and normalize at the end.
-                )
+        key = _result_key(self, histoName, norm, skipBad, binning, xrange)
+        cached = self.resultCache.get(key)
+        if cached is not None:
+            return _apply_scale(cached, scale, norm)
 
-        collTH: Optional[TH1] = None
+        # need to first add contributions, and normalize at the end.
+        norm_comp = _without_toOne(norm)
+
+        acc = _Accumulator()
         for col in self.container:
 
-            hist = col.get_th(histoName, norm, skipBad)
+            # collection scaling is applied by the contained collections
+            # to their cached results
+            hist = col.get_th(
+                histoName, norm_comp, skipBad, parallel, maxWorkers, binning, xrange,
+                self._child_scale(),
+            )
             if hist is None:
                 continue
+            acc.add(hist)
 
-            if collTH:
-                collTH.Add(hist)
-            else:
-                collTH = hist
-
+        collTH = acc.result()
         if collTH is None:
             return None
 
-        # collection scalling
-        collTH.Scale(self.scale_factor)
+        if norm is not None and norm.toOne:
+            _norm_to_one(collTH, histoName, self.title)
 
-        if norm_orig is not None and norm_orig.toOne:
-            if collTH.Integral() == 0:
-                log.warning(
-                    f"Histogram {histoName} from collection {self.title} has integral 0."
-                )
-                log.warning("Cannot normalize to one!")
-            else:
-                collTH.Scale(1.0 / collTH.Integral())
+        self.resultCache.put(key, collTH)
+        return _apply_scale(collTH, scale, norm)
 
-        return collTH
+    def get_th_many(
+        self,
+        histoNames: List[str],
+        norm: Optional[normalizationHelper] = None,
+        skipBad: bool = False,
+        scale: float = 1.0,
+    ) -> Dict[str, Optional[TH1]]:
+        """Same as get_th but for several histograms at once,
+        see collection.get_th_many
+
+        Arguments:
+            histoNames (``List[str]``): names/paths of histograms in given file
+            norm (``normalizationHelper``): defines normalization of the
+                collection, see normalizationHelper class for details
+            skipBad (``bool``): if histogram or file does not exist,
+                or is corrupted, it is skipped instead of raising error
+            scale (``float``): additional scale factor, see collection.get_th
+
+        Returns:
+            Combined histograms (``Dict[str, TH1]``), None for histograms
+            not found in any dataset
+        """
+
+        if len(self.container) == 0:
+            raise RuntimeError(f"Collection {self.title} is empty!\n Add datasets!")
+
+        keys = {name: _result_key(self, name, norm, skipBad) for name in histoNames}
+        collTHs: Dict[str, Optional[TH1]] = {
+            name: self.resultCache.get(key) for name, key in keys.items()
+        }
+        missing = [name for name, th in collTHs.items() if th is None]
+
+        if missing:
+            read = self._read_many(missing, _without_toOne(norm), skipBad)
+            for histoName, collTH in read.items():
+                if collTH is None:
+                    continue
+                if norm is not None and norm.toOne:
+                    _norm_to_one(collTH, histoName, self.title)
+                self.resultCache.put(keys[histoName], collTH)
+            collTHs.update(read)
+
+        return {name: _apply_scale(th, scale, norm) for name, th in collTHs.items()}
+
+    def _read_many(
+        self,
+        histoNames: List[str],
+        norm: Optional[normalizationHelper],
+        skipBad: bool,
+    ) -> Dict[str, Optional[TH1]]:
+        """Adds histograms of all contained collections"""
+        accs = {name: _Accumulator() for name in histoNames}
+        for col in self.container:
+            hists = col.get_th_many(histoNames, norm, skipBad, self._child_scale())
+            for histoName, hist in hists.items():
+                if hist is not None:
+                    accs[histoName].add(hist)
+        return {name: acc.result() for name, acc in accs.items()}
 
     def get_collections(self):
         return [col for col in self.container if isinstance(col, collection)]
 
 
+Node = Union[collection, SuperCollection]
+
+
+class EvaluationPlan:
+    """Evaluates several collections/SuperCollections of a container at once
+
+    Collections and SuperCollections form a DAG, where the same
+    collection may be part of many SuperCollections. The plan orders
+    all nodes reachable from the requested ones so that children come
+    before their parents, reads all histograms of each collection once
+    (see collection.get_th_many) and evaluates each SuperCollection
+    exactly once from the results of its children.
+
+    Created by CollectionContainer.plan.
+    """
+
+    def __init__(
+        self,
+        outputs: Dict[str, Node],
+        histoNames: List[str],
+        norm: Optional[normalizationHelper] = None,
+        skipBad: bool = False,
+        names: Optional[Dict[int, str]] = None,
+    ) -> None:
+        """
+        Arguments:
+            outputs (``Dict[str, Node]``): requested nodes by their name
+            histoNames (``List[str]``): names/paths of histograms
+            norm (``normalizationHelper``): normalization of the outputs
+            skipBad (``bool``): if histogram or file does not exist,
+                or is corrupted, it is skipped instead of raising error
+            names (``Dict[int, str]``): names of nodes by their id,
+                used only by explain
+        """
+        self.outputs = outputs
+        self.histoNames = histoNames
+        self.norm = norm
+        self.skipBad = skipBad
+        self.names = names if names is not None else {}
+
+        # nodes ordered children first, number of parents using each node
+        self.order: List[Node] = []
+        self.consumers: Dict[int, int] = {}
+        visiting: set = set()
+        for node in outputs.values():
+            self._visit(node, visiting)
+        # requested nodes are also needed at the end
+        for node in outputs.values():
+            self.consumers[id(node)] += 1
+
+    def _visit(self, node: Node, visiting: set) -> None:
+        if id(node) in self.consumers:
+            return
+        if id(node) in visiting:
+            log.error(f"Collection {node.title} contains itself")
+            raise RuntimeError
+        visiting.add(id(node))
+        if isinstance(node, SuperCollection):
+            for child in node.container:
+                self._visit(child, visiting)
+                self.consumers[id(child)] += 1
+        visiting.discard(id(node))
+        self.consumers[id(node)] = 0
+        self.order.append(node)
+
+    def _name(self, node: Node) -> str:
+        return self.names.get(id(node), node.title)
+
+    def evaluate(self) -> Dict[str, Dict[str, Optional[TH1]]]:
+        """Evaluates the plan
+
+        Returns:
+            Combined histograms (``Dict[str, Dict[str, TH1]]``) by name of
+            the requested node and name of the histogram, None for histograms
+            not found in any dataset
+        """
+        norm_comp = _without_toOne(self.norm)
+        pending = dict(self.consumers)
+        results: Dict[int, Dict[str, Optional[TH1]]] = {}
+        for node in self.order:
+            if isinstance(node, collection):
+                results[id(node)] = node.get_th_many(self.histoNames, norm_comp, self.skipBad)
+                continue
+            weight = 1.0 if node.scale_factor is None else node.scale_factor
+            accs = {name: _Accumulator() for name in self.histoNames}
+            for child in node.container:
+                pending[id(child)] -= 1
+                # results of the last user can be modified and released
+                owned = pending[id(child)] == 0
+                for histoName, hist in results[id(child)].items():
+                    if hist is not None:
+                        accs[histoName].add(hist, weight, owned)
+                if owned:
+                    del results[id(child)]
+            results[id(node)] = {name: acc.result() for name, acc in accs.items()}
+
+        return {name: self._output(node, results[id(node)]) for name, node in self.outputs.items()}
+
+    def _output(self, node: Node, collTHs: Dict[str, Optional[TH1]]) -> Dict[str, Optional[TH1]]:
+        """Copies results of requested node, normalized to one if needed"""
+        output: Dict[str, Optional[TH1]] = {}
+        for histoName, collTH in collTHs.items():
+            if collTH is not None:
+                collTH = _copy(collTH)
+                if self.norm is not None and self.norm.toOne:
+                    _norm_to_one(collTH, histoName, node.title)
+            output[histoName] = collTH
+        return output
+
+    def explain(self) -> str:
+        """Prints and returns order of evaluation with number
+        of histograms read from files and added together"""
+        nHistos = len(self.histoNames)
+        lines = []
+        reads = merges = 0
+        for node in self.order:
+            if isinstance(node, collection):
+                nReads = len(node) * nHistos
+                reads += nReads
+                lines.append(f"collection {self._name(node)}: {nReads} reads")
+            else:
+                nMerges = max(len(node) - 1, 0) * nHistos
+                merges += nMerges
+                lines.append(f"SuperCollection {self._name(node)}: {nMerges} merges")
+        lines.append(
+            f"Total: {len(self.order)} nodes, {reads} reads, {merges} merges"
+        )
+        text = "\n".join(lines)
+        print(text)
+        return text
+
+
 class CollectionContainer:
     """Manages a set of collections"""
 
@@ -283,6 +843,49 @@ class CollectionContainer:
             return True
         return False
 
+    def warm_sumOfWeights(self, maxWorkers: Optional[int] = None) -> None:
+        """Derives sum of weights of all datasets in the container
+        which are not cached yet, reading files in parallel,
+        see sumOfWeightHelper.warm_cache
+
+        Arguments:
+            maxWorkers (``int``): number of processes, by default
+                number of processors
+        """
+        # datasets grouped by the sum of weight helper of their collection
+        groups: Dict[int, Tuple[sumOfWeightHelper, List[dataset]]] = {}
+        for col in self.container.values():
+            cols = [col] if isinstance(col, collection) else col.get_collections()
+            for c in cols:
+                if c.sow is None:
+                    continue
+                _, datasets = groups.setdefault(id(c.sow), (c.sow, []))
+                datasets.extend(c.get_datasets())
+
+        for sow, datasets in groups.values():
+            sow.warm_cache(datasets, maxWorkers)
+
+    def plan(
+        self,
+        names: List[str],
+        histoNames: List[str],
+        norm: Optional[normalizationHelper] = None,
+        skipBad: bool = False,
+    ) -> EvaluationPlan:
+        """Creates plan evaluating several elements at once,
+        each shared collection is evaluated only once, see EvaluationPlan
+
+        Arguments:
+            names (``List[str]``): names of the elements in the container
+            histoNames (``List[str]``): names/paths of histograms
+            norm (``normalizationHelper``): normalization of the elements
+            skipBad (``bool``): if histogram or file does not exist,
+                or is corrupted, it is skipped instead of raising error
+        """
+        outputs = {name: self.get(name) for name in names}
+        nodeNames = {id(col): name for name, col in self.container.items()}
+        return EvaluationPlan(outputs, histoNames, norm, skipBad, nodeNames)
+
     def get(self, name):
         """ Get sample from supercollection
         """
@@ -1,19 +1,43 @@
-from ROOT import TH1, TTree
-from typing import Optional, Union
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
+import json
 import os
 
-# This way we can easily switch back to
-# TFile from ROOT if needed
-# Right now TFile2 does not provide
-# any advantage for dataset but
-# its derived class anyway
-from .tfile2 import TFile2 as TFile
+from . import cache
+from .filepool import TFilePool
+from .keyindex import KeyIndex, KeyInfo
+from .npbackend import NumpyGraph, NumpyHist, UprootFilePool, from_uproot
+
+if TYPE_CHECKING:
+    from ROOT import TH1, TTree
+    from .filepool import TFile
 
 import logging
 
 log = logging.getLogger(__name__)
 
 
+def _read_sumOfWeights(path: str, histoName: str, histoBin: int) -> Optional[float]:
+    """Reads sum of weights directly from the file,
+    used by worker processes. Returns None on failure.
+    """
+    from ._root import ROOT
+
+    try:
+        tFile = ROOT.TFile(path)
+    except OSError:
+        return None
+    if tFile.IsZombie():
+        return None
+    h = tFile.Get(histoName)
+    value = h.GetBinContent(histoBin) if h else None
+    tFile.Close()
+    return value
+
+
 class sumOfWeightHelper:
     """Small helper class to get sum of weight
 
@@ -21,22 +45,142 @@ class sumOfWeightHelper:
     it is better to just pass one object.
     However, it is not global enough to have it shared
     globally or something.
+
+    Sum of weights of each file is also cached on disk,
+    keyed by the file path, mtime, histoName and histoBin,
+    so next jobs do not have to open the file just to read
+    a single bin (see cache module for location of the cache).
     """
 
-    def __init__(self, histoName: str, histoBin: int) -> None:
+    def __init__(self, histoName: str, histoBin: int, useCache: bool = True) -> None:
         """
         Arguments:
             histoName (``str``): name of histogram containing sum of weights
             histoBin (``int``): bin in historgam containing sum of weights
+            useCache (``bool``): if True, on-disk cache is used
         """
         self.histoName = histoName
         self.histoBin = histoBin
+        self.useCache = useCache
+
+    @property
+    def _key(self) -> str:
+        return f"{self.histoName}:{self.histoBin}"
+
+    @staticmethod
+    def _load_entries(path: str) -> Dict:
+        """Loads cached values for the file, empty if missing or outdated"""
+        try:
+            signature = cache.file_signature(path)
+            with open(cache.cache_path("sumofweights", signature[0]), "r") as f:
+                content = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if content.get("signature") != list(signature):
+            return {}
+        return content["values"]
+
+    def lookup(self, path: str) -> Optional[float]:
+        """Returns cached sum of weights of the file, None if not cached
+
+        Arguments:
+            path (``str``): path to the ROOT file
+        """
+        if not self.useCache:
+            return None
+        return self._load_entries(path).get(self._key)
+
+    def store(self, path: str, sumOfWeights: float) -> None:
+        """Saves sum of weights of the file to the cache
+
+        Arguments:
+            path (``str``): path to the ROOT file
+            sumOfWeights (``float``): sum of weights
+        """
+        if not self.useCache:
+            return
+        entries = self._load_entries(path)
+        entries[self._key] = sumOfWeights
+        try:
+            signature = cache.file_signature(path)
+            content = {"signature": signature, "values": entries}
+            cache.write_atomic(
+                cache.cache_path("sumofweights", signature[0]),
+                json.dumps(content).encode(),
+            )
+        except OSError as e:
+            log.debug(f"Cannot save sum of weights for {path}: {e}")
+
+    def warm_cache(
+        self, datasets: List["dataset"], maxWorkers: Optional[int] = None
+    ) -> None:
+        """Derives sum of weights of all datasets which are not
+        in the cache yet, reading the files in parallel processes.
+        Unreadable files are skipped, error is raised later
+        when the sum of weights is actually needed.
+
+        Arguments:
+            datasets (``List[dataset]``): datasets to process
+            maxWorkers (``int``): number of processes, by default
+                number of processors
+        """
+        # the same file can be used by several datasets
+        missing: Dict[str, List["dataset"]] = {}
+        for ds in datasets:
+            if ds.sumOfWeights != 0:
+                continue
+            cached = self.lookup(ds.path)
+            if cached is not None:
+                ds.sumOfWeights = cached
+            else:
+                missing.setdefault(ds.path, []).append(ds)
+
+        if len(missing) == 0:
+            return
+        log.info(f"Reading sum of weights from {len(missing)} files")
+
+        paths = list(missing.keys())
+        nWorkers = maxWorkers if maxWorkers else (os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=nWorkers) as executor:
+            values = executor.map(
+                _read_sumOfWeights, paths, repeat(self.histoName), repeat(self.histoBin),
+                chunksize=max(1, len(paths) // (4 * nWorkers)),
+            )
+            for path, value in zip(paths, values):
+                if value is None or value <= 0:
+                    log.warning(f"Cannot read sum of weights from {path}")
+                    continue
+                for ds in missing[path]:
+                    ds.sumOfWeights = value
+                self.store(path, value)
 
 
 class dataset:
-    """Manages single ROOT TFile"""
+    """Manages single ROOT TFile
+
+    The TFile itself is kept in a pool shared by all datasets
+    (see TFilePool), which limits the number of files open at the
+    same time. The cap can be changed through `dataset.pool.maxOpen`.
+
+    Content of the file is described by a key index (see KeyIndex),
+    built when the file is opened for the first time and cached on disk,
+    so missing objects are found without a failed TFile.Get.
+    Can be turned off by `dataset.useKeyIndex = False`.
+
+    With backend="uproot" the file is read by uproot instead of ROOT
+    and histograms/graphs are returned as NumpyHist/NumpyGraph
+    (see npbackend), which can be merged and normalized by collection
+    and are converted to ROOT objects only when drawn by histo.
+    """
+
+    pool = TFilePool()
+    uprootPool = UprootFilePool()
+    useKeyIndex = True
+    BACKENDS = ("root", "uproot")
 
-    def __init__(self, title: str, path: str, XS: float = 1, lumi: float = 1) -> None:
+    def __init__(
+        self, title: str, path: str, XS: float = 1, lumi: float = 1, backend: str = "root"
+    ) -> None:
         """
         Arguments:
             title (``str``): title of the sample,
@@ -46,7 +190,11 @@ class dataset:
                 (use 1 for data) /sumOfWeights and luminosity
                 are treated independently
             lumi (``float``): luminosity of the sample
+            backend (``str``): "root" (default) or "uproot"
         """
+        if backend not in dataset.BACKENDS:
+            raise ValueError(f"Unknown backend {backend}, use one of {dataset.BACKENDS}")
+        self.backend = backend
         self.name = title
         # create absolute path in case context changes
         self.path = os.path.abspath(path)
@@ -56,7 +204,6 @@ class dataset:
         # dataset can be created even if it not used
         # (e.g. some central list of samples)
         # so do not open TFile until it is used
-        self.tFile: TFile
         self.open = False
 
         # In some rare cases we want to simply
@@ -66,7 +213,15 @@ class dataset:
 
         # Sum of weights for normalization of MC,
         # when 0 not initiliazed
-        self.sumOfWeights = 0
+        self.sumOfWeights: float = 0
+
+        # list of objects in the file, loaded when needed
+        self.keyIndex: Optional[KeyIndex] = None
+
+    @property
+    def tFile(self) -> TFile:
+        """TFile of the dataset, reopened if it was evicted from the pool"""
+        return self.pool.get(self.path)
 
     def open_tfile(self, skipBad: bool = False) -> bool:
         """Opens TFile corresponding to the path,
@@ -83,9 +238,13 @@ class dataset:
         # check if the file was already opened
         if not self.open:
             self.open = True
-            self.tFile = TFile(self.path)
-            # check if the file is not broken
-            if self.tFile.IsZombie():
+            # check if the file is not broken,
+            # newer ROOT raises already for missing file
+            try:
+                isZombie = self.tFile.IsZombie()
+            except OSError:
+                isZombie = True
+            if isZombie:
                 log.error(f"Problem opening file {self.path}")
                 if not skipBad:
                     raise RuntimeError
@@ -99,7 +258,7 @@ class dataset:
 
     def get(
         self, objectName: str, skipBad: bool = False
-    ) -> Optional[Union[TH1, TTree]]:
+    ) -> Optional[Union[TH1, TTree, NumpyHist, NumpyGraph]]:
         """Returns Object (usually TH1) corresponding to the path
 
         Arguments:
@@ -107,6 +266,18 @@ class dataset:
                 raise error on bad file, False by default
         """
 
+        if self.backend == "uproot":
+            return self._get_uproot(objectName, skipBad)
+
+        # check if the object exists at all, which is known
+        # from the key index without opening the file if cached
+        # (paths with cycle number are left to TFile.Get)
+        if self.useKeyIndex and ";" not in objectName:
+            index = self.get_key_index(skipBad)
+            if index is not None and objectName not in index:
+                self._missing(objectName, skipBad)
+                return None
+
         # check status of the file and raise error
         # or return None in case of issues
         if not self.open:
@@ -118,15 +289,98 @@ class dataset:
         if self.goodFile:
             h = self.tFile.Get(objectName)
             if not h:  # is not None does not work for some reason
-                if skipBad:
-                    return None
-                else:
-                    log.error(f"Object {objectName} does not exist in dataset "
-                              f"{self.name}! File path  {self.path}")
-                    raise RuntimeError
+                self._missing(objectName, skipBad)
+                return None
+            # detach from the file, so the object
+            # survives eviction of the file from the pool
+            if h.InheritsFrom("TH1"):
+                h.SetDirectory(0)
             return h
         return None
 
+    def _get_uproot(
+        self, objectName: str, skipBad: bool
+    ) -> Optional[Union[NumpyHist, NumpyGraph]]:
+        """Reads histogram or graph with uproot"""
+        try:
+            uFile = self.uprootPool.get(self.path)
+        except OSError:
+            log.error(f"Problem opening file {self.path}")
+            if not skipBad:
+                raise RuntimeError
+            return None
+        self.open = True
+        self.goodFile = True
+
+        if objectName not in uFile:
+            self._missing(objectName, skipBad)
+            return None
+        obj = from_uproot(uFile[objectName])
+        if obj is None:
+            log.error(f"Object {objectName} in {self.path} is not supported by uproot backend")
+            raise TypeError(f"Object {objectName} is not supported by uproot backend")
+        return obj
+
+    def _missing(self, objectName: str, skipBad: bool) -> None:
+        """Raises error for object missing in the file unless skipBad"""
+        if skipBad:
+            return
+        log.error(f"Object {objectName} does not exist in dataset "
+                  f"{self.name}! File path  {self.path}")
+        raise RuntimeError
+
+    def get_key_index(self, skipBad: bool = False) -> Optional[KeyIndex]:
+        """Returns index of objects in the file. It is loaded
+        from the cache if up-to-date, otherwise the file is opened
+        and the index is built and saved to the cache.
+
+        Arguments:
+            skipBad (``bool``): if True, does not
+                raise error on bad file, False by default
+
+        Returns:
+            KeyIndex (``KeyIndex``), None for bad file
+        """
+        if self.keyIndex is None:
+            self.keyIndex = KeyIndex.load(self.path)
+        if self.keyIndex is None and self.open_tfile(skipBad):
+            log.debug(f"Building key index for {self.path}")
+            self.keyIndex = KeyIndex.build(self.tFile)
+            self.keyIndex.save(self.path)
+        return self.keyIndex
+
+    def has(self, objectName: str) -> bool:
+        """Returns True if the object exists in the file,
+        False also for bad files
+
+        Arguments:
+            objectName (``str``): name/path of the object
+        """
+        index = self.get_key_index(skipBad=True)
+        return index is not None and objectName in index
+
+    def get_key_info(self, objectName: str) -> Optional[KeyInfo]:
+        """Returns class name and dimension of the object,
+        None if it does not exist
+
+        Arguments:
+            objectName (``str``): name/path of the object
+        """
+        index = self.get_key_index(skipBad=True)
+        return index.get_info(objectName) if index is not None else None
+
+    def list_histos(self, pattern: str = "*") -> List[str]:
+        """Returns names of histograms (TH1 and derived)
+        in the file matching shell-style pattern
+
+        Arguments:
+            pattern (``str``): pattern, e.g. `dir/ptll_*`
+        """
+        index = self.get_key_index(skipBad=True)
+        if index is None:
+            return []
+        return index.names(pattern, histosOnly=True)
+
     def get_sumOfWeights(self, sow: sumOfWeightHelper) -> float:
         """Defines sum of weight of given dataset and returns it.
         The weight is saved so next time function is called the same
@@ -145,14 +399,22 @@ class dataset:
         if self.sumOfWeights != 0:
             return self.sumOfWeights
 
+        # try cache from previous jobs
+        cached = sow.lookup(self.path)
+        if cached is not None:
+            self.sumOfWeights = cached
+            return self.sumOfWeights
+
         # get histogram with sum of weights
         h = self.get(sow.histoName, False)
 
-        if h is None:
+        if h is None or isinstance(h, NumpyGraph):
             log.error(f"Histogram {sow.histoName} does not exist!")
             raise RuntimeError
         else:
             self.sumOfWeights = h.GetBinContent(sow.histoBin)
+            if self.sumOfWeights > 0:
+                sow.store(self.path, self.sumOfWeights)
         # TODO Here I can imagine negative sum of weights
         # e.g. for some interferance sample but I have no idea
         # how to handle such cases
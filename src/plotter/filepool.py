@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict
+import atexit
+
+if TYPE_CHECKING:
+    from .tfile2 import TFile2 as TFile
+
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class TFilePool:
+    """Bounded pool of open TFiles shared by datasets
+
+    Keeping every file open for the lifetime of a dataset
+    quickly hits the file-descriptor limit for large sample
+    catalogs. The pool keeps at most `maxOpen` files open,
+    closes the least recently used one when the cap is reached
+    and transparently reopens it on the next access.
+
+    Objects read from an evicted file are deleted by ROOT unless
+    they were detached from it (TH1::SetDirectory(0)), which is
+    done by dataset.get for histograms. TTrees cannot be detached,
+    so they are only valid until their file is evicted.
+    """
+
+    def __init__(self, maxOpen: int = 256) -> None:
+        """
+        Arguments:
+            maxOpen (``int``): maximum number of files kept open
+        """
+        if maxOpen < 1:
+            raise ValueError("TFilePool needs to allow at least one open file")
+        self.maxOpen = maxOpen
+        self._files: "OrderedDict[str, TFile]" = OrderedDict()
+        # paths opened at least once, used to count reopens
+        self._seen: set = set()
+
+        self.hits = 0
+        self.misses = 0
+        self.reopens = 0
+        self.evictions = 0
+
+        # files have to be closed before ROOT tears down
+        # its list of files at the exit
+        atexit.register(self.close_all)
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._files
+
+    def get(self, path: str) -> TFile:
+        """Returns open TFile for the path, opening it if necessary.
+
+        Broken (zombie) files are returned but not kept in the pool,
+        it is up to the caller to check `IsZombie()`.
+
+        Arguments:
+            path (``str``): path to the ROOT file
+        """
+        tFile = self._files.get(path)
+        if tFile is not None:
+            self.hits += 1
+            self._files.move_to_end(path)
+            return tFile
+
+        self.misses += 1
+        if path in self._seen:
+            self.reopens += 1
+            log.debug(f"Reopening evicted file {path}")
+
+        # imported here, so the pool can be created without ROOT,
+        # this way we can also easily switch back to TFile from ROOT
+        from .tfile2 import TFile2 as TFile
+
+        self._shrink(self.maxOpen - 1)
+        tFile = TFile(path)
+        if tFile.IsZombie():
+            return tFile
+
+        self._seen.add(path)
+        self._files[path] = tFile
+        return tFile
+
+    def close(self, path: str) -> None:
+        """Closes the file if it is open, next `get` reopens it"""
+        tFile = self._files.pop(path, None)
+        if tFile is not None:
+            tFile.Close()
+
+    def close_all(self) -> None:
+        """Closes all files in the pool"""
+        self._shrink(0)
+
+    def _shrink(self, size: int) -> None:
+        """Closes least recently used files until at most `size` stay open"""
+        while len(self._files) > max(size, 0):
+            path, tFile = self._files.popitem(last=False)
+            log.debug(f"Closing least recently used file {path}")
+            tFile.Close()
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Returns counters useful to tune `maxOpen`"""
+        return {
+            "open": len(self._files),
+            "maxOpen": self.maxOpen,
+            "hits": self.hits,
+            "misses": self.misses,
+            "reopens": self.reopens,
+            "evictions": self.evictions,
+        }
+
+    def reset_stats(self) -> None:
+        """Sets all counters to zero"""
+        self.hits = 0
+        self.misses = 0
+        self.reopens = 0
+        self.evictions = 0
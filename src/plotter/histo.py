@@ -1,15 +1,20 @@
-import ROOT
+from ._root import ROOT
 from ROOT import TH1
+import numpy as np
 from . import thHelper
 from . import loader
-from typing import Optional, Dict, Any, List, Union, Tuple
+from functools import partial
+from types import MappingProxyType
+from typing import Callable, Optional, Dict, Any, List, Mapping, Tuple, Union
 from plotter.plottingbase import Plottable
+from .npbackend import NumpyGraph, NumpyHist
 
 import logging
 
 log = logging.getLogger(__name__)
 
-ROOT.TH1.AddDirectory(False)
+# shared by histos without config, read-only as configs from loader
+_NO_CONFIG: Mapping[str, Any] = MappingProxyType({})
 
 
 class histo(Plottable):
@@ -21,6 +26,8 @@ class histo(Plottable):
     are handled by other classes
     """
 
+    __slots__ = ("_th", "_extrema", "title", "config", "isTH1", "isTGraph")
+
     def __init__(
         self,
         title: str,
@@ -32,24 +39,146 @@ class histo(Plottable):
     ) -> None:
         """
         Arguments:
-            th (``TH1``): ROOT histogram
+            th (``TH1``): ROOT histogram, NumpyHist/NumpyGraph
+                are converted to TH1/TGraph
             linecolor (``int``): color of the histogram line
             fillcolor (``int/None``): color of the histogram fill,
                 can be None
         """
+        if isinstance(th, NumpyHist):
+            th = th.to_th1()
+        elif isinstance(th, NumpyGraph):
+            th = th.to_tgraph()
         self.th = th
         self.title = title
         super().__init__()
 
         self.linecolor = linecolor
         self.fillcolor = fillcolor
-        self.config = loader.load_config(configPath) if configPath != "" else {}
+        self.config = loader.load_config(configPath) if configPath != "" else _NO_CONFIG
         self.drawoption = drawoption
         self.apply_all_style()
 
         self.isTH1 = th.InheritsFrom("TH1")
         self.isTGraph = th.InheritsFrom("TGraph")
 
+    @classmethod
+    def from_numpy(
+        cls,
+        title: str,
+        edges: Union[np.ndarray, List[np.ndarray]],
+        contents: np.ndarray,
+        sumw2: Optional[np.ndarray] = None,
+        **kwargs,
+    ) -> "histo":
+        """Creates histo from numpy arrays, 1D or 2D
+        depending on the number of axes.
+
+        Arguments:
+            title (``str``): title of the histo, also name of the TH1
+            edges (``np.ndarray/List[np.ndarray]``): bin edges of x axis,
+                or list of bin edges for each axis
+            contents (``np.ndarray``): bin contents with axis order (x, y),
+                with or without under/overflow bins
+            sumw2 (``np.ndarray``): sum of weights squared (squared errors)
+                in the same format as contents, None for sqrt(contents)
+            kwargs: other arguments of the histo constructor
+        """
+        if isinstance(edges, np.ndarray) and edges.ndim == 1:
+            edges = [edges]
+        edges = [np.asarray(e, dtype=np.float64) for e in edges]
+        shape = tuple(len(e) + 1 for e in edges)
+
+        def flat(array: np.ndarray) -> np.ndarray:
+            array = np.asarray(array, dtype=np.float64).reshape(
+                [n if array.size == np.prod(shape) else n - 2 for n in shape], order="F"
+            )
+            if array.shape != shape:
+                array = np.pad(array, 1)
+            return array.ravel(order="F")
+
+        flatContents = flat(contents)
+        inner = flatContents.reshape(shape, order="F")[tuple(slice(1, -1) for _ in shape)]
+        th = NumpyHist(
+            edges,
+            flatContents,
+            None if sumw2 is None else flat(sumw2),
+            entries=float(inner.sum()),
+            name=title,
+            title=title,
+        ).to_th1()
+        return cls(title, th, **kwargs)
+
+    @property
+    def th(self) -> TH1:
+        """Wrapped ROOT histogram or graph"""
+        return self._th
+
+    @th.setter
+    def th(self, th: TH1) -> None:
+        self._th = th
+        self.invalidate_extrema()
+
+    def invalidate_extrema(self) -> None:
+        """Drops cached extrema, needed only if the wrapped histogram
+        is modified directly (e.g. `th.Fill`) and not through the methods
+        or the `contents`/`sumw2` arrays of histo"""
+        self._extrema: Optional[Dict[Tuple, Tuple[float, float, float]]] = None
+
+    def get_extrema(
+        self, xMin: Optional[float] = None, xMax: Optional[float] = None
+    ) -> Tuple[float, float, float]:
+        """Returns (minimum, minimum above zero, maximum) of the contents
+        within the x range (see thHelper.get_extrema), results are cached
+        until the contents are changed through histo methods. Accessing
+        `contents` or `sumw2` drops the cache too, but writes to arrays
+        kept from earlier access need invalidate_extrema
+
+        Arguments:
+            xMin (``float``): lower limit of the x range, None for no limit
+            xMax (``float``): upper limit of the x range, None for no limit
+        """
+        key = (xMin, xMax)
+        if self._extrema is None:
+            self._extrema = {}
+        extrema = self._extrema.get(key)
+        if extrema is None:
+            extrema = thHelper.get_extrema(self.th, xMin, xMax)
+            self._extrema[key] = extrema
+        return extrema
+
+    @property
+    def contents(self) -> np.ndarray:
+        """Bin contents as flat numpy array sharing memory with the TH1,
+        including under/overflow bins in ROOT global bin order,
+        see thHelper.get_contents_view. Statistics (mean, RMS) are not
+        updated by writes to the array, use `th.ResetStats()`.
+        The array keeps the TH1 alive, but it is invalidated by methods
+        reallocating the bins (rebin, TH1::Sumw2, TH1::SetBins)"""
+        # the array is writable, cached extrema cannot be trusted anymore
+        self.invalidate_extrema()
+        return thHelper.get_contents_view(self.th)
+
+    @property
+    def sumw2(self) -> np.ndarray:
+        """Sum of weights squared (squared bin errors) as numpy array
+        sharing memory with the TH1, in the same order as `contents`.
+        Storing of sum of weights squared is enabled if needed,
+        the array is invalidated in the same cases as `contents`."""
+        self.invalidate_extrema()
+        sumw2 = thHelper.get_sumw2_view(self.th)
+        if sumw2 is None:
+            self.th.Sumw2()
+            sumw2 = thHelper.get_sumw2_view(self.th)
+        assert sumw2 is not None
+        return sumw2
+
+    @property
+    def edges(self) -> List[np.ndarray]:
+        """Bin edges for each axis of the histogram (copies)"""
+        axes = [self.th.GetXaxis(), self.th.GetYaxis(), self.th.GetZaxis()]
+        return [thHelper.get_edges(axis) for axis in axes[: self.th.GetDimension()]]
+
     def apply_all_style(self):
         self.th.SetTitle(self.title)
 
@@ -74,6 +203,7 @@ class histo(Plottable):
         Arguments:
             otherHist (``histo``): histogram to divide by
             option (``str``): if B then binomial errors"""
+        self.invalidate_extrema()
         return self.th.Divide(self.th, otherHisto.th, 1, 1, option)
 
     def divide_ratio(self, otherHisto: "histo"):
@@ -86,6 +216,7 @@ class histo(Plottable):
             otherHisto (``histo``): histo to be divided by
         """
         thHelper.divide_ratio(self.th, otherHisto.th)
+        self.invalidate_extrema()
 
     def get_ratio(
         self, otherHisto: "histo", suffix: str = "ratio", fillToLine: bool = False
@@ -102,9 +233,9 @@ class histo(Plottable):
         hratio = self.clone(th_suffix=suffix)
         # TODO: histo of different type?
         if self.isTH1:
-            thHelper.divide_ratio(hratio.th, otherHisto.th)
+            hratio.divide_ratio(otherHisto)
         elif self.isTGraph:
-            thHelper.divide_ratio_graph(hratio.th, otherHisto.th)
+            hratio.set_th(thHelper.divide_ratio_graph(hratio.th, otherHisto.th))
         else:
             log.error("Cannot divide histo, not TH1 or TGraph")
             raise TypeError("Cannot divide histo, not TH1 or TGraph")
@@ -122,6 +253,18 @@ class histo(Plottable):
         hratio.linecolor = linecolor
         return hratio
 
+    def set_th(self, th: TH1) -> None:
+        """Replaces the wrapped histogram/graph by another one
+        of the same kind, all properties of the histo are kept.
+
+        Arguments:
+            th (``TH1``): new ROOT histogram or graph
+        """
+        decorators = self.decorators
+        self.th = th
+        self.decorate(**decorators)
+        self.apply_all_style()
+
     def style_histo(self, style: Dict[str, Any]) -> None:
         """Applies style to the histo
 
@@ -131,38 +274,10 @@ class histo(Plottable):
 
         log.debug("Updating histo style")
 
-        for opt, set in style.items():
-            if "markersize" in opt:
-                self.th.SetMarkerSize(set)
-            elif "fillstyle" in opt:
-                self.th.SetFillStyle(set)
-            elif "linestyle" in opt:
-                self.th.SetLineStyle(set)
-            elif "drawoption" in opt:
-                self.drawoption = set
-            else:
-                log.error(f"Unknown option {opt}")
-                raise RuntimeError
-
-    def _edges_from_tuple(
-        self, edges: List[float], binning: List[Tuple[int, float]]
-    ) -> List[float]:
-        for bindef in binning:
-            (nbins, width) = bindef
-            for i in range(nbins):
-                w = edges[-1] + width
-                if w <= self.th.GetXaxis().GetXmax():
-                    edges.append(w)
-                else:
-                    log.warning(
-                        "Rebinning requires either int or list, got binning that exceeds histogram range"
-                    )
-        last_edge = edges[-1]
-        if last_edge < self.th.GetXaxis().GetXmax():
-            edges.append(self.th.GetXaxis().GetXmax())
-        return edges
-
-    def rebin(self, binning: Union[int, List[Union[float, Tuple[int, float]]]]):
+        for setter, set in loader.compile_style(style, _compile_histo_style):
+            setter(self, set)
+
+    def rebin(self, binning: thHelper.BinningType):
         """Rebins histogram either based on nbin or binning.
 
         - If variable is int it merges given number of bins (so TH1::Rebin)
@@ -174,37 +289,13 @@ class histo(Plottable):
             binning (``Union[int, List[Union[float, tuple]]]``): binning used in the new histogram
         """
 
-        if isinstance(binning, int):
-            self.th.Rebin(binning)
+        binedges = thHelper.parse_binning(binning, self.th.GetXaxis().GetXmax())
+        if isinstance(binedges, int):
+            self.th.Rebin(binedges)
+            self.invalidate_extrema()
             return
 
-        # binning [xmin, x1, x2, ... ]
-        if isinstance(binning, list) and all(isinstance(x, float) for x in binning):
-
-            if len(binning) < 2:
-                log.error("Rebinning requires either int or list, got empty list")
-                raise ValueError(
-                    "Rebinning requires either int or list, got empty list"
-                )
-
-            binedges = binning
-
-        # binning [ xmin, {nbinx, width}, {nbinx,width}, ...]
-        elif (
-            isinstance(binning, list)
-            and isinstance(binning[0], (float, int))
-            and all(isinstance(x, tuple) for x in binning[1:])
-        ):
-            binedges = self._edges_from_tuple([binning[0]], binning[1:])  # type: ignore
-        else:
-            raise ValueError(
-                f"Binning {binning} does not have correct format, has to be either:\n"
-                " - int\n"
-                " - list of numbers\n"
-                " - list of float + tuples (number of bins, bin width)"
-            )
-
-        self.th = thHelper.rebin(self.th, binedges, False)  # type: ignore
+        self.th = thHelper.rebin(self.th, binedges, False)
         self.apply_all_style()
 
     def clone(self, th_suffix: Optional[str] = None, histo_title: Optional[str] = None):
@@ -216,12 +307,19 @@ class histo(Plottable):
         if th_suffix is not None:
             hname = histo_title + "_" + th_suffix
 
-        h = histo(histo_title, self.th.Clone(hname))
+        th = self.th.Clone(hname)
+        # clones are owned by the histo, not by ROOT directories,
+        # so they are deleted together with it
+        if self.isTH1:
+            th.SetDirectory(0)
+        ROOT.SetOwnership(th, True)
+        h = histo(histo_title, th)
         h.decorate(self)
 
         return h
 
     def add(self, otherHisto: Union["histo", List["histo"]]):
+        self.invalidate_extrema()
         if isinstance(otherHisto, histo):
             self.th.Add(otherHisto.th)
         elif isinstance(otherHisto, list):
@@ -234,8 +332,39 @@ class histo(Plottable):
 
     def scale(self, factor: float):
         self.th.Scale(factor)
+        self.invalidate_extrema()
 
     def normalize(self):
         integral = self.th.Integral()
         if integral != 0:
             self.th.Scale(1.0 / integral)
+            self.invalidate_extrema()
+
+
+# styles are translated to lists of (setter, value) once per config,
+# see loader.compile_style
+
+
+def _set_th(setter: Callable, h: histo, set: Any) -> None:
+    setter(h.th, set)
+
+
+def _set_drawoption(h: histo, set: Any) -> None:
+    h.drawoption = set
+
+
+def _compile_histo_style(style: Dict[str, Any]) -> List[loader.Setter]:
+    setters: List[loader.Setter] = []
+    for opt, set in style.items():
+        if "markersize" in opt:
+            setters.append((partial(_set_th, ROOT.TAttMarker.SetMarkerSize), set))
+        elif "fillstyle" in opt:
+            setters.append((partial(_set_th, ROOT.TAttFill.SetFillStyle), set))
+        elif "linestyle" in opt:
+            setters.append((partial(_set_th, ROOT.TAttLine.SetLineStyle), set))
+        elif "drawoption" in opt:
+            setters.append((_set_drawoption, set))
+        else:
+            log.error(f"Unknown option {opt}")
+            raise RuntimeError
+    return setters
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import fnmatch
+import json
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional
+
+from . import cache
+
+if TYPE_CHECKING:
+    from ROOT import TDirectory
+
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class KeyInfo(NamedTuple):
+    """Description of a single object in a file"""
+
+    className: str
+    # number of dimensions for histograms and graphs, 0 otherwise
+    dimension: int
+    # True if the class inherits from TH1
+    isHisto: bool
+
+
+def _describe(className: str) -> KeyInfo:
+    from ._root import ROOT
+
+    tClass = ROOT.TClass.GetClass(className)
+    if not tClass:
+        return KeyInfo(className, 0, False)
+    for base, dim in (("TH3", 3), ("TH2", 2), ("TH1", 1)):
+        if tClass.InheritsFrom(base):
+            return KeyInfo(className, dim, True)
+    if tClass.InheritsFrom("TGraph2D"):
+        return KeyInfo(className, 2, False)
+    if tClass.InheritsFrom("TGraph"):
+        return KeyInfo(className, 1, False)
+    return KeyInfo(className, 0, False)
+
+
+class KeyIndex:
+    """Index of all objects stored in a ROOT file
+
+    Holds full paths of the objects (e.g. `dir/histo`)
+    with their class names and dimensions. The index is
+    saved to a cache keyed by path, size and mtime of the
+    file, so later jobs can check existence or type
+    of an object without opening the file at all.
+    """
+
+    def __init__(self, keys: Dict[str, KeyInfo]) -> None:
+        """
+        Arguments:
+            keys (``Dict[str, KeyInfo]``): object path to its description
+        """
+        self.keys = keys
+
+    def __contains__(self, objectName: str) -> bool:
+        return objectName.lstrip("/") in self.keys
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def get_info(self, objectName: str) -> Optional[KeyInfo]:
+        """Returns description of the object, None if not in the file"""
+        return self.keys.get(objectName.lstrip("/"))
+
+    def names(self, pattern: str = "*", histosOnly: bool = False) -> List[str]:
+        """Returns paths of objects matching shell-style pattern
+
+        Arguments:
+            pattern (``str``): pattern, e.g. `dir/ptll_*`
+            histosOnly (``bool``): if True, only TH1 derived objects are returned
+        """
+        names = [
+            name
+            for name, info in self.keys.items()
+            if not histosOnly or info.isHisto
+        ]
+        if pattern == "*":
+            return names
+        return fnmatch.filter(names, pattern)
+
+    @classmethod
+    def build(cls, tDir: TDirectory) -> "KeyIndex":
+        """Creates index by walking all (sub)directories of a file"""
+        keys: Dict[str, KeyInfo] = {}
+        cls._walk(tDir, "", keys)
+        return cls(keys)
+
+    @classmethod
+    def _walk(cls, tDir: TDirectory, prefix: str, keys: Dict[str, KeyInfo]) -> None:
+        from ._root import ROOT
+
+        for key in tDir.GetListOfKeys():
+            name = prefix + key.GetName()
+            # several cycles of the same object, first is the newest one
+            if name in keys:
+                continue
+            className = key.GetClassName()
+            keys[name] = _describe(className)
+            tClass = ROOT.TClass.GetClass(className)
+            if tClass and tClass.InheritsFrom("TDirectory"):
+                cls._walk(tDir.GetDirectory(key.GetName()), name + "/", keys)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["KeyIndex"]:
+        """Loads index of the file from the cache,
+        returns None if missing or outdated
+
+        Arguments:
+            path (``str``): path to the ROOT file
+        """
+        try:
+            signature = cache.file_signature(path)
+            with open(cache.cache_path("keyindex", signature[0]), "r") as f:
+                content = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if content.get("signature") != list(signature):
+            log.debug(f"Outdated key index for {path}")
+            return None
+        return cls({name: KeyInfo(*info) for name, info in content["keys"].items()})
+
+    def save(self, path: str) -> None:
+        """Saves index of the file to the cache
+
+        Arguments:
+            path (``str``): path to the ROOT file
+        """
+        try:
+            signature = cache.file_signature(path)
+            content = {"signature": signature, "keys": self.keys}
+            cache.write_atomic(
+                cache.cache_path("keyindex", signature[0]), json.dumps(content).encode()
+            )
+        except OSError as e:
+            log.debug(f"Cannot save key index for {path}: {e}")
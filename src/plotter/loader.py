@@ -1,25 +1,93 @@
 import json
 import os
 import sys
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Tuple
 import logging
 
 log = logging.getLogger(__name__)
 
 """ Class for handling of configs
 
-Currently only loading.
+Configs are cached, they are parsed again only when the
+modification time or size of the file changes. Cached configs are
+shared, so they are read-only. Style configs are translated once
+into lists of setters (see compile_style).
 
 TODO: Saving? Overwrite?
 """
 
+# path -> ((mtime, size), config)
+_CONFIGS: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+
+# (id of compiler, id of style) -> (options of the style, compiled style)
+_COMPILED: "OrderedDict[Tuple[int, int], Tuple[List, List]]" = OrderedDict()
+_MAX_COMPILED = 256
+
+# setter with the value it sets
+Setter = Tuple[Callable, Any]
+
 
 def path():
     pkgPath = os.path.dirname(sys.modules["plotter"].__file__)
     return pkgPath + "/"
 
 
+def _freeze(config: Any) -> Any:
+    """Returns read-only version of parsed JSON,
+    objects become MappingProxyType and arrays tuples"""
+    if isinstance(config, dict):
+        return MappingProxyType({key: _freeze(value) for key, value in config.items()})
+    if isinstance(config, list):
+        return tuple(_freeze(value) for value in config)
+    return config
+
+
 def load_config(path: str):
+    """Returns parsed JSON config. The config is shared between
+    all callers, so it is read-only (dicts are MappingProxyType,
+    lists are tuples), modifications raise TypeError. Use e.g.
+    `dict(config)` to get a modifiable copy.
+
+    Arguments:
+        path (``str``): path to the config
+    """
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _CONFIGS.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
     log.debug(f"Loading config file {path}")
     with open(path, "r") as f:
-        config = json.load(f)
-        return config
+        config = _freeze(json.load(f))
+    _CONFIGS[path] = (signature, config)
+    return config
+
+
+def compile_style(
+    style: Dict[str, Any], compiler: Callable[[Dict[str, Any]], List[Setter]]
+) -> List[Setter]:
+    """Returns style translated by the compiler to a list of (setter, value),
+    the result is cached while the same style object with the same
+    options is used, so options of configs from load_config
+    are dispatched only once
+
+    Arguments:
+        style (``Dict[str, Any]``): style config
+        compiler (``Callable``): function translating the style
+    """
+    key = (id(compiler), id(style))
+    options = list(style.items())
+    cached = _COMPILED.get(key)
+    # comparing options also catches reused ids and modified styles
+    if cached is not None and cached[0] == options:
+        _COMPILED.move_to_end(key)
+        return cached[1]
+
+    compiled = compiler(style)
+    _COMPILED[key] = (options, compiled)
+    if len(_COMPILED) > _MAX_COMPILED:
+        _COMPILED.popitem(last=False)
+    return compiled
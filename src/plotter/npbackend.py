@@ -0,0 +1,450 @@
+""" ROOT-free numpy representation of histograms and graphs
+
+NumpyHist and NumpyGraph hold the payload of TH1/TH2 and TGraph
+objects as numpy arrays. They implement the small subset of the TH1
+interface used when merging and normalizing (Scale, Add, Integral, ...),
+so they can be used by collection.get_th in place of TH1. ROOT
+is imported only when converting back to TH1/TGraph for drawing.
+
+The files are read by uproot (optional dependency) through the
+UprootFilePool, see dataset(..., backend="uproot").
+"""
+
+from collections import OrderedDict
+from typing import Any, List, Optional
+
+import numpy as np
+
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class NumpyHist:
+    """Histogram (1D or 2D) stored in numpy arrays
+
+    Contents and sum of weights squared are flat arrays including
+    under/overflow, in the same order as the internal TH1 array
+    (x changes fastest), so conversion from/to TH1 is a single copy.
+    """
+
+    def __init__(
+        self,
+        edges: List[np.ndarray],
+        contents: np.ndarray,
+        sumw2: Optional[np.ndarray] = None,
+        entries: float = 0,
+        name: str = "",
+        title: str = "",
+        className: str = "TH1D",
+        stats: Optional[np.ndarray] = None,
+    ) -> None:
+        """
+        Arguments:
+            edges (``List[np.ndarray]``): bin edges for each axis
+            contents (``np.ndarray``): flat bin contents including flow bins
+            sumw2 (``np.ndarray``): flat sum of weights squared, None if
+                not stored (errors are then sqrt of contents)
+            entries (``float``): number of entries
+            name (``str``): name of the histogram
+            title (``str``): title of the histogram
+            className (``str``): class of the original ROOT histogram
+            stats (``np.ndarray``): statistics in the format of TH1::GetStats
+                (sumw, sumw2, sumwx, sumwx2, ...), None if unknown
+        """
+        self.edges = [np.asarray(e, dtype=np.float64) for e in edges]
+        self.contents = np.asarray(contents, dtype=np.float64)
+        self.sumw2 = None if sumw2 is None else np.asarray(sumw2, dtype=np.float64)
+        self.stats = None if stats is None else np.asarray(stats, dtype=np.float64)
+        self.entries = entries
+        self.name = name
+        self.title = title
+        self.className = className
+
+        if self.contents.size != int(np.prod(self.shape)):
+            raise ValueError("Contents do not match the binning")
+
+    @property
+    def shape(self) -> tuple:
+        """Number of bins including flow for each axis"""
+        return tuple(len(e) + 1 for e in self.edges)
+
+    @property
+    def dimension(self) -> int:
+        return len(self.edges)
+
+    def _inner(self, array: np.ndarray) -> np.ndarray:
+        """Returns array without under/overflow bins"""
+        grid = array.reshape(self.shape, order="F")
+        return grid[tuple(slice(1, -1) for _ in self.edges)]
+
+    def values(self, flow: bool = False) -> np.ndarray:
+        """Returns bin contents with axis order (x, y)"""
+        if flow:
+            return self.contents.reshape(self.shape, order="F")
+        return self._inner(self.contents)
+
+    def variances(self, flow: bool = False) -> np.ndarray:
+        """Returns squared errors of bins with axis order (x, y)"""
+        sumw2 = self.sumw2 if self.sumw2 is not None else np.abs(self.contents)
+        if flow:
+            return sumw2.reshape(self.shape, order="F")
+        return self._inner(sumw2)
+
+    # Subset of TH1 interface used when merging
+
+    def GetName(self) -> str:
+        return self.name
+
+    def GetTitle(self) -> str:
+        return self.title
+
+    def GetEntries(self) -> float:
+        return self.entries
+
+    def SetEntries(self, entries: float) -> None:
+        self.entries = entries
+
+    def GetNcells(self) -> int:
+        return self.contents.size
+
+    def InheritsFrom(self, className: str) -> bool:
+        return className in ("TH1", f"TH{self.dimension}")
+
+    def GetBinContent(self, bin: int) -> float:
+        """Returns content of the bin, bin is the global bin number"""
+        return float(self.contents[bin])
+
+    def Integral(self) -> float:
+        """Sum of contents without under/overflow, same as TH1::Integral()"""
+        return float(self._inner(self.contents).sum())
+
+    def Sumw2(self) -> None:
+        """Starts storing sum of weights squared, same as TH1::Sumw2"""
+        if self.sumw2 is None:
+            self.sumw2 = np.abs(self.contents)
+
+    def Scale(self, c1: float = 1.0) -> None:
+        """Scales contents, same as TH1::Scale without options"""
+        if c1 != 1:
+            self.Sumw2()
+        self.contents *= c1
+        if self.sumw2 is not None:
+            self.sumw2 *= c1 * c1
+        if self.stats is not None:
+            self.stats *= c1
+            # sum of weights squared
+            self.stats[1] *= c1
+
+    def Add(self, other: "NumpyHist", c1: float = 1.0) -> None:
+        """Adds other histogram scaled by c1, same as TH1::Add"""
+        if self.contents.shape != other.contents.shape or not all(
+            np.array_equal(a, b) for a, b in zip(self.edges, other.edges)
+        ):
+            log.error("Cannot add histograms with different binning!")
+            raise ValueError("Cannot add histograms with different binning!")
+        if self.sumw2 is None and (other.sumw2 is not None or c1 != 1):
+            self.Sumw2()
+        if self.sumw2 is not None:
+            self.sumw2 += c1 * c1 * other.variances(flow=True).ravel(order="F")
+        self.contents += c1 * other.contents
+        self.entries = abs(self.entries + c1 * other.entries)
+        if self.stats is not None and other.stats is not None:
+            self.stats += c1 * other.stats
+            self.stats[1] += (c1 * c1 - c1) * other.stats[1]
+        else:
+            self.stats = None
+
+    def add_to_th1(self, th: Any) -> None:
+        """Adds content of this histogram into ROOT histogram
+        with the same binning, the arrays are added in place.
+
+        Arguments:
+            th (``TH1``): target histogram
+        """
+        from . import thHelper
+
+        contents = thHelper.get_contents_view(th)
+        if contents.size != self.contents.size:
+            log.error("Cannot add histograms with different binning!")
+            raise ValueError("Cannot add histograms with different binning!")
+        stats = thHelper.get_stats(th)
+        entries = th.GetEntries()
+
+        contents += self.contents.astype(contents.dtype)
+        if th.GetSumw2N() == 0 and self.sumw2 is not None:
+            th.Sumw2()
+        sumw2 = thHelper.get_sumw2_view(th)
+        if sumw2 is not None:
+            sumw2 += self.variances(flow=True).ravel(order="F")
+
+        if self.stats is not None:
+            th.PutStats(stats + self.stats)
+        else:
+            th.ResetStats()
+        th.SetEntries(entries + self.entries)
+
+    def Clone(self, name: Optional[str] = None) -> "NumpyHist":
+        return NumpyHist(
+            [e.copy() for e in self.edges],
+            self.contents.copy(),
+            None if self.sumw2 is None else self.sumw2.copy(),
+            self.entries,
+            self.name if name is None else name,
+            self.title,
+            self.className,
+            None if self.stats is None else self.stats.copy(),
+        )
+
+    @classmethod
+    def from_th1(cls, th: Any) -> "NumpyHist":
+        """Copies TH1 (or TH2) into numpy arrays"""
+        from . import thHelper
+
+        edges = [thHelper.get_edges(th.GetXaxis())]
+        if th.GetDimension() == 2:
+            edges.append(thHelper.get_edges(th.GetYaxis()))
+        elif th.GetDimension() > 2:
+            raise TypeError("Only 1D and 2D histograms are supported")
+        sumw2 = thHelper.get_sumw2_view(th)
+        return cls(
+            edges,
+            thHelper.get_contents_view(th).astype(np.float64),
+            None if sumw2 is None else sumw2.copy(),
+            th.GetEntries(),
+            th.GetName(),
+            th.GetTitle(),
+            th.ClassName(),
+            thHelper.get_stats(th),
+        )
+
+    def rebin(self, edges: np.ndarray) -> "NumpyHist":
+        """Returns copy with new bin edges of the x axis,
+        same as thHelper.rebin, 1D only
+
+        Arguments:
+            edges (``np.ndarray``): new bin edges, each has to match
+                one of the current edges
+        """
+        from . import thHelper
+
+        if self.dimension != 1:
+            raise TypeError("Only 1D histograms can be rebinned")
+        edges = np.array(edges, dtype=np.float64)
+        plan = thHelper.get_rebin_plan(self.edges[0], edges)
+        size = len(edges) + 1
+        return NumpyHist(
+            [edges],
+            np.bincount(plan, self.contents, size),
+            np.bincount(plan, self.variances(flow=True), size),
+            self.entries,
+            self.name,
+            self.title,
+            self.className,
+        )
+
+    def to_th1(self, name: Optional[str] = None) -> Any:
+        """Creates ROOT histogram with the same content,
+        imports ROOT when called for the first time.
+
+        Arguments:
+            name (``str``): name of the new histogram,
+                name of this histogram by default
+        """
+        from ._root import ROOT
+        from . import thHelper
+
+        # float and double histograms keep their type, rest is stored as double
+        precision = "F" if self.className.endswith("F") else "D"
+        thName = self.name if name is None else name
+        if self.dimension == 1:
+            th = getattr(ROOT, "TH1" + precision)(
+                thName, self.title, len(self.edges[0]) - 1, self.edges[0]
+            )
+        elif self.dimension == 2:
+            th = getattr(ROOT, "TH2" + precision)(
+                thName, self.title,
+                len(self.edges[0]) - 1, self.edges[0],
+                len(self.edges[1]) - 1, self.edges[1],
+            )
+        else:
+            raise TypeError("Only 1D and 2D histograms are supported")
+        th.SetDirectory(0)
+        thHelper.get_contents_view(th)[:] = self.contents
+        if self.sumw2 is not None:
+            th.Sumw2()
+            sumw2 = thHelper.get_sumw2_view(th)
+            assert sumw2 is not None
+            sumw2[:] = self.sumw2
+        if self.stats is not None:
+            th.PutStats(self.stats)
+        else:
+            th.ResetStats()
+        th.SetEntries(self.entries)
+        return th
+
+
+def tree_sum(hists: List[NumpyHist]) -> Optional[NumpyHist]:
+    """Sums histograms pairwise (in a tree), the first
+    histogram of each pair is used as the accumulator.
+    Returns None for empty list.
+    """
+    while len(hists) > 1:
+        for first, second in zip(hists[::2], hists[1::2]):
+            first.Add(second)
+        hists = hists[::2]
+    return hists[0] if hists else None
+
+
+class NumpyGraph:
+    """TGraph (optionally with errors) stored in numpy arrays"""
+
+    def __init__(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        exl: Optional[np.ndarray] = None,
+        exh: Optional[np.ndarray] = None,
+        eyl: Optional[np.ndarray] = None,
+        eyh: Optional[np.ndarray] = None,
+        name: str = "",
+        title: str = "",
+        className: str = "TGraph",
+    ) -> None:
+        """
+        Arguments:
+            x, y (``np.ndarray``): coordinates of the points
+            exl, exh, eyl, eyh (``np.ndarray``): low/high errors,
+                None if the graph does not have errors
+            name (``str``): name of the graph
+            title (``str``): title of the graph
+            className (``str``): class of the original ROOT graph
+        """
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.exl = exl
+        self.exh = exh
+        self.eyl = eyl
+        self.eyh = eyh
+        self.name = name
+        self.title = title
+        self.className = className
+
+    def GetN(self) -> int:
+        return len(self.x)
+
+    def GetName(self) -> str:
+        return self.name
+
+    def InheritsFrom(self, className: str) -> bool:
+        return className == "TGraph"
+
+    def to_tgraph(self, name: Optional[str] = None) -> Any:
+        """Creates ROOT graph with the same points,
+        imports ROOT when called for the first time.
+        """
+        from ._root import ROOT
+
+        n = len(self.x)
+        if self.eyl is None or self.eyh is None:
+            graph = ROOT.TGraph(n, self.x, self.y) if n else ROOT.TGraph()
+        else:
+            zeros = np.zeros(n)
+            exl = zeros if self.exl is None else self.exl
+            exh = zeros if self.exh is None else self.exh
+            graph = ROOT.TGraphAsymmErrors(n, self.x, self.y, exl, exh, self.eyl, self.eyh)
+        graph.SetName(self.name if name is None else name)
+        graph.SetTitle(self.title)
+        return graph
+
+
+def _member(obj: Any, name: str) -> Optional[np.ndarray]:
+    if not obj.has_member(name):
+        return None
+    # copy, uproot keeps the read objects cached
+    return np.array(obj.member(name), dtype=np.float64)
+
+
+def from_uproot(obj: Any) -> Optional[Any]:
+    """Converts object read by uproot to NumpyHist/NumpyGraph,
+    returns None for unsupported classes
+    """
+    className = obj.classname
+    if className.startswith("TProfile"):
+        return None
+    if className.startswith(("TH1", "TH2")):
+        axes = [obj.member("fXaxis")]
+        if className.startswith("TH2"):
+            axes.append(obj.member("fYaxis"))
+        edges = [axis.edges() for axis in axes]
+        contents = np.array(obj.values(flow=True).ravel(order="F"), dtype=np.float64)
+        sumw2 = _member(obj, "fSumw2")
+        statNames = ["fTsumw", "fTsumw2", "fTsumwx", "fTsumwx2"]
+        if className.startswith("TH2"):
+            statNames += ["fTsumwy", "fTsumwy2", "fTsumwxy"]
+        return NumpyHist(
+            edges,
+            contents,
+            sumw2 if sumw2 is not None and len(sumw2) else None,
+            obj.member("fEntries"),
+            obj.member("fName"),
+            obj.member("fTitle"),
+            className,
+            np.array([obj.member(stat) for stat in statNames]),
+        )
+    if className.startswith("TGraph") and not className.startswith("TGraph2D"):
+        x = np.array(obj.member("fX"), dtype=np.float64)
+        y = np.array(obj.member("fY"), dtype=np.float64)
+        if className.startswith("TGraphAsymmErrors"):
+            exl, exh = _member(obj, "fEXlow"), _member(obj, "fEXhigh")
+            eyl, eyh = _member(obj, "fEYlow"), _member(obj, "fEYhigh")
+        elif className.startswith("TGraphErrors"):
+            exl = exh = _member(obj, "fEX")
+            eyl = eyh = _member(obj, "fEY")
+        else:
+            exl = exh = eyl = eyh = None
+        return NumpyGraph(
+            x, y, exl, exh, eyl, eyh, obj.member("fName"), obj.member("fTitle"), className
+        )
+    return None
+
+
+class UprootFilePool:
+    """Bounded pool of files opened by uproot, see TFilePool"""
+
+    def __init__(self, maxOpen: int = 256) -> None:
+        """
+        Arguments:
+            maxOpen (``int``): maximum number of files kept open
+        """
+        self.maxOpen = maxOpen
+        self._files: "OrderedDict[str, Any]" = OrderedDict()
+
+    def get(self, path: str) -> Any:
+        """Returns uproot file for the path, raises OSError if broken"""
+        uFile = self._files.get(path)
+        if uFile is not None:
+            self._files.move_to_end(path)
+            return uFile
+
+        try:
+            import uproot
+        except ImportError:
+            log.error("uproot backend requires uproot, install it with `pip install uproot`")
+            raise
+
+        while len(self._files) >= self.maxOpen:
+            _, oldFile = self._files.popitem(last=False)
+            oldFile.close()
+        try:
+            uFile = uproot.open(path)
+        except Exception as e:
+            raise OSError(f"Failed to open file {path}: {e}")
+        self._files[path] = uFile
+        return uFile
+
+    def close_all(self) -> None:
+        """Closes all files in the pool"""
+        while self._files:
+            _, uFile = self._files.popitem(last=False)
+            uFile.close()
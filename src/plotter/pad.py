@@ -1,9 +1,10 @@
 from . import loader
 from .histo import histo
 from . import thHelper
-import ROOT
-from ROOT import TPad
-from typing import List, Dict, Optional, Any
+from ._root import ROOT
+from ROOT import TPad, TH1, TAxis
+from functools import partial
+from typing import Callable, List, Dict, Mapping, Optional, Any, Tuple
 
 import logging
 
@@ -38,7 +39,7 @@ class pad:
         self.tpad = TPad(name, name, xl, yl, xh, yh)
         self.name = name
 
-        self.config: Dict[str, Any] = {}
+        self.config: Mapping[str, Any] = {}
         if configPath != "":
             self.config = loader.load_config(configPath)
 
@@ -66,6 +67,8 @@ class pad:
         self.autoY = autoY
 
         self.basis: Optional[histo] = None
+        # frame of the basis, reused while the binning does not change
+        self._frame: Optional[TH1] = None
 
     def reset_histos(self) -> None:
         """Removes all histograms but keeps all non-histo settings"""
@@ -74,6 +77,15 @@ class pad:
         self.customYrange = False
         self.basis = None
 
+    def close(self) -> None:
+        """Deletes the TPad and the basis, histograms are only released"""
+        if not hasattr(self, "tpad"):
+            return
+        self.tpad.Close()
+        del self.tpad
+        self.reset_histos()
+        self._frame = None
+
     def margins(
         self,
         up: Optional[float] = None,
@@ -140,64 +152,60 @@ class pad:
         Arguments:
             h (``histo``): added histogram
         """
-        self._update_range(h)
+        self._update_range(h, self.histos == [])
         self.histos.append(h)
 
     def update_range(self) -> None:
+        """Recomputes min/max y value from all histograms,
+        only the part inside the current x range is considered"""
+        for i, h in enumerate(self.histos):
+            self._update_range(h, i == 0)
 
-        for h in self.histos:
-            self._update_range(h)
-
-    def _update_range(self, h: histo) -> None:
+    def _update_range(self, h: histo, first: bool) -> None:
 
         if h.isTH1:
-            self._update_range_th1(h)
+            self._update_range_th1(h, first)
         elif h.isTGraph:
-            self._update_range_tgraph(h)
+            self._update_range_tgraph(h, first)
+
+    def _custom_xrange(self) -> Tuple[Optional[float], Optional[float]]:
+        """x range for the extrema, no limits unless set by user"""
+        if self.customXrange:
+            return (self.xMin, self.xMax)
+        return (None, None)
 
-    def _update_range_th1(
-        self, h: histo
-    ) -> None:  # TODO this function needs to take the xmin, xmax range into account!
+    def _update_range_th1(self, h: histo, first: bool) -> None:
         """Updates yMin/yMax if applicable for TH1"""
 
-        if not self.customXrange:
-            if self.histos == []:
-                self.xMin = h.th.GetBinLowEdge(1)
-                self.xMax = h.th.GetBinLowEdge(h.th.GetNbinsX() + 1)
+        if not self.customXrange and first:
+            self.xMin = h.th.GetBinLowEdge(1)
+            self.xMax = h.th.GetBinLowEdge(h.th.GetNbinsX() + 1)
 
         # if custom range defined, skip the automatic derivation
         if self.customYrange:
             return
 
-        if self.histos == []:
-            self.yMin = h.th.GetMinimum()
-            self.yMinZero = h.th.GetMinimum(0)
-            self.yMax = h.th.GetMaximum()
+        yMin, yMinZero, yMax = h.get_extrema(*self._custom_xrange())
+        if first:
+            self.yMin, self.yMinZero, self.yMax = yMin, yMinZero, yMax
         else:
-            if self.yMin > h.th.GetMinimum():
-                self.yMin = h.th.GetMinimum()
-            if self.yMinZero > h.th.GetMinimum(0):
-                self.yMinZero = h.th.GetMinimum(0)
-            if self.yMax < h.th.GetMaximum():
-                self.yMax = h.th.GetMaximum()
-
-    def _update_range_tgraph(self, h: histo) -> None:
-        """Updates yMin/yMax if applicable for TH1"""
+            self.yMin = min(self.yMin, yMin)
+            self.yMinZero = min(self.yMinZero, yMinZero)
+            self.yMax = max(self.yMax, yMax)
+
+    def _update_range_tgraph(self, h: histo, first: bool) -> None:
+        """Updates yMin/yMax if applicable for TGraph"""
 
         # if custom range defined, skip the automatic derivation
         if self.customYrange:
             return
 
-        if self.histos == []:
-            self.yMin = thHelper.get_graph_minimum(h.th)
-            self.yMax = thHelper.get_graph_maximum(h.th)
+        yMin, _, yMax = h.get_extrema(*self._custom_xrange())
+        if first:
+            self.yMin, self.yMax = yMin, yMax
         else:
-            cur_min = thHelper.get_graph_minimum(h.th)
-            if self.yMin > cur_min:
-                self.yMin = cur_min
-            cur_max = thHelper.get_graph_maximum(h.th)
-            if self.yMax < cur_max:
-                self.yMax = cur_max
+            self.yMin = min(self.yMin, yMin)
+            self.yMax = max(self.yMax, yMax)
 
     def plot_histos(self) -> None:
         """Plots histograms, including creation of basis,
@@ -211,27 +219,17 @@ class pad:
             raise IndexError
 
         self.tpad.cd()
-        # now lets clone the first histogram to manipulate axis and such
-        # this is done because we do not want to modify any externally provided
-        # histograms
-        # TODO: add histo.clone??
-        if self.histos[0].isTGraph:
-            self.basis = histo(
-                "",
-                self.histos[0].th.Clone("basis").GetHistogram(),
-                linecolor=ROOT.kWhite,
-                fillcolor=ROOT.kWhite,
-                drawoption="hist",
-            )
-        else:
-            self.basis = histo(
-                "",
-                self.histos[0].th.Clone("basis"),
-                linecolor=ROOT.kWhite,
-                fillcolor=ROOT.kWhite,
-                drawoption="hist",
-            )
-        self.basis.th.Reset()
+        # basis is an empty frame with axes of the first histogram,
+        # it handles axis titles and ranges, so externally provided
+        # histograms are not modified
+        self._frame = thHelper.make_frame(self.histos[0].th, self._frame)
+        self.basis = histo(
+            "",
+            self._frame,
+            linecolor=ROOT.kWhite,
+            fillcolor=ROOT.kWhite,
+            drawoption="hist",
+        )
         self._set_basis_axis_title()
 
         if self.customYrange:
@@ -361,18 +359,8 @@ class pad:
 
         log.debug("Updating margin style")
 
-        for opt, set in style.items():
-            if "margin_up" in opt:
-                self.tpad.SetTopMargin(set)
-            elif "margin_down" in opt:
-                self.tpad.SetBottomMargin(set)
-            elif "margin_left" in opt:
-                self.tpad.SetLeftMargin(set)
-            elif "margin_right" in opt:
-                self.tpad.SetRightMargin(set)
-            else:
-                log.error(f"Unknown option {opt}")
-                raise RuntimeError
+        for setter, set in loader.compile_style(style, _compile_margin_style):
+            setter(self.tpad, set)
 
     def style_pad_basis(self, style: Dict[str, Any]) -> None:
         """Applies style to the pad basis
@@ -386,8 +374,8 @@ class pad:
             raise RuntimeError
         log.debug("Updating basis style")
 
-        for opt, set in style.items():
-            self.update_style(opt, set)
+        for setter, set in loader.compile_style(style, _compile_basis_style):
+            setter(self.basis.th, set)
 
     def update_style(self, opt: str, set: Any) -> None:
         """Update an option.
@@ -400,24 +388,77 @@ class pad:
             log.error("Called pad style but no basis yet!")
             raise RuntimeError
 
+        for setter, value in _compile_basis_style({opt: set}):
+            setter(self.basis.th, value)
+
+
+# STYLE HELPERS
+# styles are translated to lists of (setter, value) once per config,
+# see loader.compile_style
+
+
+def _compile_margin_style(style: Dict[str, Any]) -> List[loader.Setter]:
+    setters: List[loader.Setter] = []
+    for opt, set in style.items():
+        if "margin_up" in opt:
+            setters.append((TPad.SetTopMargin, set))
+        elif "margin_down" in opt:
+            setters.append((TPad.SetBottomMargin, set))
+        elif "margin_left" in opt:
+            setters.append((TPad.SetLeftMargin, set))
+        elif "margin_right" in opt:
+            setters.append((TPad.SetRightMargin, set))
+        else:
+            log.error(f"Unknown option {opt}")
+            raise RuntimeError
+    return setters
+
+
+def _set_x_axis(setter: Callable, th: TH1, set: Any) -> None:
+    setter(th.GetXaxis(), set)
+
+
+def _set_y_axis(setter: Callable, th: TH1, set: Any) -> None:
+    setter(th.GetYaxis(), set)
+
+
+def _set_ndivisions(th: TH1, set: Any) -> None:
+    th.SetNdivisions(set[0], set[1])
+
+
+def _compile_basis_style(style: Dict[str, Any]) -> List[loader.Setter]:
+    setters: List[loader.Setter] = []
+    for opt, set in style.items():
         if "x_" in opt:
-            axis = self.basis.th.GetXaxis()
-            update_style_axis(axis, opt, set)
+            setters.append((partial(_set_x_axis, _axis_setter(opt)), set))
         elif "y_" in opt:
-            axis = self.basis.th.GetYaxis()
-            update_style_axis(axis, opt, set)
+            setters.append((partial(_set_y_axis, _axis_setter(opt)), set))
         elif "n_div" in opt:
             if len(set) != 2:
                 log.error("n_div option in wrong format, need two items")
                 raise RuntimeError
-            if self.basis.isTH1:
-                self.basis.th.SetNdivisions(set[0], set[1])
+            # basis is always a TH1 frame
+            setters.append((_set_ndivisions, set))
         else:
             log.error(f"Unknown option {opt}")
             raise RuntimeError
+    return setters
 
 
-# STYLE HELPERS
+def _axis_setter(opt: str) -> Callable:
+    """Returns setter of TAxis for the option"""
+    if "titleOffset" in opt:
+        return TAxis.SetTitleOffset
+    elif "titleSize" in opt:
+        return TAxis.SetTitleSize
+    elif "titleFont" in opt:
+        return TAxis.SetTitleFont
+    elif "labelSize" in opt:
+        return TAxis.SetLabelSize
+    elif "labelFont" in opt:
+        return TAxis.SetLabelFont
+    log.error(f"Unknown option {opt}")
+    raise RuntimeError
 
 
 def update_style_axis(axis, opt, set):
@@ -428,16 +469,4 @@ def update_style_axis(axis, opt, set):
         opt (``str``): option name
         set (``Any``): option value
     """
-    if "titleOffset" in opt:
-        axis.SetTitleOffset(set)
-    elif "titleSize" in opt:
-        axis.SetTitleSize(set)
-    elif "titleFont" in opt:
-        axis.SetTitleFont(set)
-    elif "labelSize" in opt:
-        axis.SetLabelSize(set)
-    elif "labelFont" in opt:
-        axis.SetLabelFont(set)
-    else:
-        log.error(f"Unknown option {opt}")
-        raise RuntimeError
+    _axis_setter(opt)(axis, set)
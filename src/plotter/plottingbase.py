@@ -4,7 +4,8 @@ Adapted from https://github.com/rootpy/rootpy
 """
 
 import sys
-import ROOT
+from functools import lru_cache, wraps
+from ._root import ROOT
 
 
 __all__ = [
@@ -18,6 +19,27 @@ class Plottable(object):
     and to override ROOT TAttXXX and Draw methods.
     """
 
+    # compact instances, style containers are shared (see _shared_style),
+    # __dict__ allows additional attributes of subclasses and users
+    __slots__ = (
+        "norm",
+        "drawoption",
+        "legendstyle",
+        "integermode",
+        "visible",
+        "inlegend",
+        "_linecolor",
+        "_linestyle",
+        "_linewidth",
+        "_fillcolor",
+        "_fillstyle",
+        "_markercolor",
+        "_markerstyle",
+        "_markersize",
+        "__dict__",
+        "__weakref__",
+    )
+
     # todo handle copy construction
     def __init__(self, **kwargs):
         self._post_init(**kwargs)
@@ -71,28 +93,28 @@ class Plottable(object):
             # or freshly init-ing a rootpy object
             # Initialize style attrs to style of TObject
             if isinstance(self.th, ROOT.TAttLine):
-                self._linecolor = Color(ROOT.TAttLine.GetLineColor(self.th))
-                self._linestyle = LineStyle(ROOT.TAttLine.GetLineStyle(self.th))
+                self._linecolor = _shared_style(Color, ROOT.TAttLine.GetLineColor(self.th))
+                self._linestyle = _shared_style(LineStyle, ROOT.TAttLine.GetLineStyle(self.th))
                 self._linewidth = ROOT.TAttLine.GetLineWidth(self.th)
             else:  # HistStack
-                self._linecolor = Color(Plottable.DEFAULT_DECOR["linecolor"])
-                self._linestyle = LineStyle(Plottable.DEFAULT_DECOR["linestyle"])
+                self._linecolor = _shared_style(Color, Plottable.DEFAULT_DECOR["linecolor"])
+                self._linestyle = _shared_style(LineStyle, Plottable.DEFAULT_DECOR["linestyle"])
                 self._linewidth = Plottable.DEFAULT_DECOR["linewidth"]
 
             if isinstance(self.th, ROOT.TAttFill):
-                self._fillcolor = Color(ROOT.TAttFill.GetFillColor(self.th))
-                self._fillstyle = FillStyle(ROOT.TAttFill.GetFillStyle(self.th))
+                self._fillcolor = _shared_style(Color, ROOT.TAttFill.GetFillColor(self.th))
+                self._fillstyle = _shared_style(FillStyle, ROOT.TAttFill.GetFillStyle(self.th))
             else:  # HistStack
-                self._fillcolor = Color(Plottable.DEFAULT_DECOR["fillcolor"])
-                self._fillstyle = FillStyle(Plottable.DEFAULT_DECOR["fillstyle"])
+                self._fillcolor = _shared_style(Color, Plottable.DEFAULT_DECOR["fillcolor"])
+                self._fillstyle = _shared_style(FillStyle, Plottable.DEFAULT_DECOR["fillstyle"])
 
             if isinstance(self.th, ROOT.TAttMarker):
-                self._markercolor = Color(ROOT.TAttMarker.GetMarkerColor(self.th))
-                self._markerstyle = MarkerStyle(ROOT.TAttMarker.GetMarkerStyle(self.th))
+                self._markercolor = _shared_style(Color, ROOT.TAttMarker.GetMarkerColor(self.th))
+                self._markerstyle = _shared_style(MarkerStyle, ROOT.TAttMarker.GetMarkerStyle(self.th))
                 self._markersize = ROOT.TAttMarker.GetMarkerSize(self.th)
             else:  # HistStack
-                self._markercolor = Color(Plottable.DEFAULT_DECOR["markercolor"])
-                self._markerstyle = MarkerStyle(Plottable.DEFAULT_DECOR["markerstyle"])
+                self._markercolor = _shared_style(Color, Plottable.DEFAULT_DECOR["markercolor"])
+                self._markerstyle = _shared_style(MarkerStyle, Plottable.DEFAULT_DECOR["markerstyle"])
                 self._markersize = Plottable.DEFAULT_DECOR["markersize"]
 
             if obj is None:
@@ -202,7 +224,7 @@ class Plottable(object):
         For full documentation of accepted *color* arguments, see
         :class:`rootpy.plotting.style.Color`.
         """
-        self._linecolor = Color(color)
+        self._linecolor = _shared_style(Color, color)
         if isinstance(self.th, ROOT.TAttLine):
             ROOT.TAttLine.SetLineColor(self.th, self._linecolor("root"))
 
@@ -228,7 +250,7 @@ class Plottable(object):
         For full documentation of accepted *style* arguments, see
         :class:`rootpy.plotting.style.LineStyle`.
         """
-        self._linestyle = LineStyle(style)
+        self._linestyle = _shared_style(LineStyle, style)
         if isinstance(self.th, ROOT.TAttLine):
             ROOT.TAttLine.SetLineStyle(self.th, self._linestyle("root"))
 
@@ -270,7 +292,7 @@ class Plottable(object):
         For full documentation of accepted *color* arguments, see
         :class:`rootpy.plotting.style.Color`.
         """
-        self._fillcolor = Color(color)
+        self._fillcolor = _shared_style(Color, color)
         if isinstance(self.th, ROOT.TAttFill):
             ROOT.TAttFill.SetFillColor(self.th, self._fillcolor("root"))
 
@@ -296,7 +318,7 @@ class Plottable(object):
         For full documentation of accepted *style* arguments, see
         :class:`rootpy.plotting.style.FillStyle`.
         """
-        self._fillstyle = FillStyle(style)
+        self._fillstyle = _shared_style(FillStyle, style)
         if isinstance(self.th, ROOT.TAttFill):
             ROOT.TAttFill.SetFillStyle(self.th, self._fillstyle("root"))
 
@@ -322,7 +344,7 @@ class Plottable(object):
         For full documentation of accepted *color* arguments, see
         :class:`rootpy.plotting.style.Color`.
         """
-        self._markercolor = Color(color)
+        self._markercolor = _shared_style(Color, color)
         if isinstance(self.th, ROOT.TAttMarker):
             ROOT.TAttMarker.SetMarkerColor(self.th, self._markercolor("root"))
 
@@ -348,7 +370,7 @@ class Plottable(object):
         For full documentation of accepted *style* arguments, see
         :class:`rootpy.plotting.style.MarkerStyle`.
         """
-        self._markerstyle = MarkerStyle(style)
+        self._markerstyle = _shared_style(MarkerStyle, style)
         if isinstance(self.th, ROOT.TAttMarker):
             ROOT.TAttMarker.SetMarkerStyle(self.th, self._markerstyle("root"))
 
@@ -479,16 +501,23 @@ class Plottable(object):
 class _StyleContainer(object):
     """
     Base class for grouping together an input style with ROOT and matplotlib
-    styles.
+    styles. The matplotlib style is converted only when requested.
+    Containers are immutable, so they can be shared (see _shared_style).
     """
 
+    __slots__ = ("_input", "_function", "_root")
+
     def __init__(self, value, function):
         self._input = value
+        self._function = function
         self._root = function(value, "root")
+
+    @property
+    def _mpl(self):
         try:
-            self._mpl = function(value, "mpl")
+            return self._function(self._input, "mpl")
         except ValueError:
-            self._mpl = self._root
+            return self._root
 
     def __call__(self, output_type=None):
         if not output_type:
@@ -499,6 +528,39 @@ class _StyleContainer(object):
         return str(self._input)
 
 
+# size of the cache of each conversion function
+_CONVERSION_CACHE_SIZE = 1024
+# inputs for which results of the conversions are cached
+_PLAIN_TYPES = (int, float, str, tuple)
+# ROOT color indices are resolved through the (mutable) color table
+_PLAIN_COLOR_TYPES = (str, tuple)
+
+
+def _memoize(plainTypes=_PLAIN_TYPES):
+    """Returns decorator caching results of a style conversion function
+    for plain inputs (by default numbers, strings, tuples), others
+    (e.g. lists or TColor objects) are converted each time"""
+
+    def decorator(function):
+        cached = lru_cache(maxsize=_CONVERSION_CACHE_SIZE, typed=True)(function)
+
+        @wraps(function)
+        def convert(inputstyle, mode, *args, **kwargs):
+            if inputstyle is None or isinstance(inputstyle, plainTypes):
+                try:
+                    return cached(inputstyle, mode, *args, **kwargs)
+                except TypeError:
+                    # tuple with unhashable items
+                    pass
+            return function(inputstyle, mode, *args, **kwargs)
+
+        convert.cache_info = cached.cache_info
+        convert.cache_clear = cached.cache_clear
+        return convert
+
+    return decorator
+
+
 #  #############################
 #  ### Markers #################
 
@@ -586,6 +648,7 @@ markerstyles_text2root = {
 }
 
 
+@_memoize()
 def convert_markerstyle(inputstyle, mode, inputmode=None):  # noqa:C901
     """
     Convert *inputstyle* to ROOT or matplotlib format.
@@ -655,6 +718,8 @@ class MarkerStyle(_StyleContainer):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, style):
         _StyleContainer.__init__(self, style, convert_markerstyle)
 
@@ -696,6 +761,7 @@ linestyles_text2root = {
 }
 
 
+@_memoize()
 def convert_linestyle(inputstyle, mode, inputmode=None):  # noqa: C901
     """
     Convert *inputstyle* to ROOT or matplotlib format.
@@ -764,6 +830,8 @@ class LineStyle(_StyleContainer):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, style):
         _StyleContainer.__init__(self, style, convert_linestyle)
 
@@ -797,6 +865,7 @@ fillstyles_text2root = {
 }
 
 
+@_memoize()
 def convert_fillstyle(inputstyle, mode, inputmode=None):  # noqa: C901
     """
     Convert *inputstyle* to ROOT or matplotlib format.
@@ -871,6 +940,8 @@ class FillStyle(_StyleContainer):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, style):
         _StyleContainer.__init__(self, style, convert_fillstyle)
 
@@ -1029,6 +1100,7 @@ _cnames = {
 }
 
 
+@_memoize(_PLAIN_COLOR_TYPES)
 def convert_color(color, mode):  # noqa: C901
     """
     Convert *color* to a TColor if *mode='root'* or to (r,g,b) if 'mpl'.
@@ -1042,6 +1114,10 @@ def convert_color(color, mode):  # noqa: C901
         4) a float, like '0.4', indicating gray on a 0-1 scale
 
     if *arg* is *RGBA*, the transparency value will be ignored.
+
+    Results for strings and sequences are cached. Color indices and
+    TColors are converted each time, because they are resolved through
+    the color table of gROOT, which can be changed (e.g. TColor::SetRGB).
     """
 
     mode = mode.lower()
@@ -1075,13 +1151,16 @@ def convert_color(color, mode):  # noqa: C901
         return convert_color((color, color, color), mode)
     try:
         # color is a TColor
+        if isinstance(color, (int, float)):
+            raise TypeError
         color = ROOT.TColor(color)
         color = color.GetRed(), color.GetGreen(), color.GetBlue()
         return convert_color(color, mode)
     except (TypeError, ReferenceError):
         pass
     try:
-        # color is a ROOT color index
+        # color is a ROOT color index, converted through its RGB
+        # values (cached), so changes of the color table are respected
         if color < 0:
             color = 0
         color = ROOT.gROOT.GetColor(color)
@@ -1133,5 +1212,35 @@ class Color(_StyleContainer):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, color):
-        _StyleContainer.__init__(self, color, convert_color)
+        self._input = color
+        self._function = convert_color
+        # other inputs are validated right away, color indices are always valid
+        if not isinstance(color, int):
+            convert_color(color, "root")
+
+    @property
+    def _root(self):
+        # converted on each access, color indices are resolved through
+        # the color table of gROOT which can change (see convert_color)
+        return convert_color(self._input, "root")
+
+
+@lru_cache(maxsize=_CONVERSION_CACHE_SIZE, typed=True)
+def _cached_style(cls, style):
+    return cls(style)
+
+
+def _shared_style(cls, style):
+    """Returns style container shared by all objects with the same
+    style (flyweight), containers of other than plain inputs
+    (numbers, strings, tuples) are created each time"""
+    if style is None or isinstance(style, _PLAIN_TYPES):
+        try:
+            return _cached_style(cls, style)
+        except TypeError:
+            # tuple with unhashable items
+            pass
+    return cls(style)
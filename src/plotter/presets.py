@@ -3,9 +3,10 @@ from .pad import pad
 from .histo import histo
 from . import loader
 from .legend import legend
+from . import thHelper
 
-import ROOT
-from typing import List, Optional
+from ._root import ROOT
+from typing import List, Optional, Tuple
 import copy
 
 import logging
@@ -13,7 +14,31 @@ import logging
 log = logging.getLogger(__name__)
 
 
-class simple:
+class _preset:
+    """Lifecycle shared by the presets, they can be used
+    as context managers which close the canvas on exit"""
+
+    canvas: canvas
+    # attributes holding histograms/legends created by the preset
+    _created: Tuple[str, ...] = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the canvas and releases all ROOT objects created
+        by the preset, input histograms are not modified"""
+        self.canvas.close()
+        for name in self._created:
+            self.__dict__.pop(name, None)
+
+
+class simple(_preset):
+    _created = ("leg",)
+
     def __init__(
         self,
         plotName: str = "",
@@ -21,8 +46,9 @@ class simple:
         yTitle: Optional[str] = "Events",
         isTH1: bool = True,
         autoY=True,
+        autoClose: bool = False,
     ):
-        self.canvas = canvas(plotName)
+        self.canvas = canvas(plotName, autoClose=autoClose)
 
         self.mainPad = pad(
             "main",
@@ -61,7 +87,9 @@ class simple:
         self.canvas.save(plotName, verbose)
 
 
-class dataMC:
+class dataMC(_preset):
+    _created = ("leg", "hMCs", "hErr", "hRatio", "hRatioShapes")
+
     def __init__(
         self,
         plotName: str = "",
@@ -71,11 +99,14 @@ class dataMC:
         fraction: float = 0.3,
         ratio_limits=(0.701, 1.299),
         nonEmpty=True,
+        autoClose: bool = False,
     ):
         self.custom_xrange = False
         self.nonEmpty = nonEmpty
+        # bins with content not above are treated as empty
+        self.emptyThreshold = 0.0
 
-        self.canvas = canvas(plotName)
+        self.canvas = canvas(plotName, autoClose=autoClose)
 
         self.mainPad = pad(
             "main", yl=fraction, configPath=loader.path() + "configs/pad_dm.json"
@@ -96,8 +127,24 @@ class dataMC:
         self.ratioPad.set_title(xTitle, ratioTitle)
 
     def add_and_plot(
-        self, hData: histo, _hMCs: List[histo], _hShapes: List[histo] = []
+        self,
+        hData: histo,
+        _hMCs: List[histo],
+        _hShapes: List[histo] = [],
+        lazy: bool = False,
     ):
+        """Plots data, stack of MC and optionally shapes
+
+        Arguments:
+            hData (``histo``): data histogram
+            _hMCs (``List[histo]``): MC histograms, the first one
+                is on top of the stack
+            _hShapes (``List[histo]``): histograms drawn as lines
+            lazy (``bool``): if True, MC histograms with `visible = False`
+                only contribute to the stack, their stacked histograms are not
+                created (neither drawn nor in legend). The top of the stack
+                is always created.
+        """
 
         if len(_hMCs) == 0:
             log.error("List of MC histograms is empty")
@@ -106,13 +153,7 @@ class dataMC:
         self.hData = hData
 
         # stack the MC
-        self.hMCs: List[histo] = []
-        for _hMC in _hMCs:
-            hMC = _hMC.clone("stack")
-            hMC.linewidth = 0  # do not show stat of individual stack components
-            for hOther in self.hMCs:
-                hOther.th.Add(hMC.th)
-            self.hMCs.append(hMC)
+        self.hMCs: List[histo] = self._stack(_hMCs, lazy)
 
         # MC stat uncertainty
         if len(self.hMCs):
@@ -167,6 +208,22 @@ class dataMC:
 
         self.update_ranges()
 
+    def _stack(self, _hMCs: List[histo], lazy: bool) -> List[histo]:
+        """Returns stacked MC histograms, see thHelper.stack_cumulative"""
+        hMCs: List[Optional[histo]] = []
+        for i, _hMC in enumerate(_hMCs):
+            if lazy and i > 0 and not getattr(_hMC, "visible", True):
+                hMCs.append(None)
+                continue
+            hMC = _hMC.clone("stack")
+            hMC.linewidth = 0  # do not show stat of individual stack components
+            hMCs.append(hMC)
+
+        thHelper.stack_cumulative(
+            [h.th for h in _hMCs], [h.th if h is not None else None for h in hMCs]
+        )
+        return [h for h in hMCs if h is not None]
+
     def update_ranges(self):
 
         if self.nonEmpty and not self.custom_xrange:
@@ -178,32 +235,10 @@ class dataMC:
         self.ratioPad.update_range()
 
     def _xrange_emptysupressed(self):
-        """Determine x range containing nonzero"""  # TODO REVIEW
-        xMin = self.hData.th.GetBinLowEdge(1)
-        xMax = self.hData.th.GetBinLowEdge(self.hData.th.GetNbinsX() + 1)
-        prevCont = False
-        minDone = False
-        maxDone = False
-        for i in range(self.hData.th.GetNbinsX()):
-            iBin = i + 1
-            if (
-                self.hData.th.GetBinContent(iBin) != 0
-                or self.hMCs[0].th.GetBinContent(iBin) != 0
-            ):
-                minDone = True
-                prevCont = True
-                continue
-
-            if not minDone:
-                xMin = self.hData.th.GetBinLowEdge(iBin + 1)
-            if prevCont:
-                xMax = self.hData.th.GetBinLowEdge(iBin)
-                maxDone = True
-            prevCont = False
-        if not maxDone:
-            xMax = self.hData.th.GetBinLowEdge(self.hData.th.GetNbinsX() + 1)
-
-        return (xMin, xMax)
+        """Determine x range containing nonzero data or MC"""
+        return thHelper.nonempty_xrange(
+            [self.hData.th, self.hMCs[0].th], self.emptyThreshold
+        )
 
     def set_xrange(self, min, max):
         self.custom_xrange = True
@@ -230,16 +265,19 @@ class dataMC:
         self.canvas.save(plotName)
 
 
-class fraction:
+class fraction(_preset):
     """E.g. to display fraction of background/signal"""
 
+    _created = ("leg", "hFrac", "hAll")
+
     def __init__(
         self,
         plotName: str = "",
         xTitle: Optional[str] = None,
         yTitle: Optional[str] = "Fraction",
+        autoClose: bool = False,
     ):
-        self.canvas = canvas(plotName)
+        self.canvas = canvas(plotName, autoClose=autoClose)
 
         self.mainPad = pad("fraction")
         self.canvas.add_pad(self.mainPad)
@@ -260,6 +298,8 @@ class fraction:
             if first:
                 self.hAll = copy.copy(h)
                 self.hAll.th = h.th.Clone("stack")
+                self.hAll.th.SetDirectory(0)
+                ROOT.SetOwnership(self.hAll.th, True)
                 first = False
             else:
                 self.hAll.th.Add(h.th)
@@ -287,7 +327,9 @@ class fraction:
         self.canvas.save(plotName, verbose)
 
 
-class Comparison:
+class Comparison(_preset):
+    _created = ("leg", "hErr", "hRatios")
+
     def __init__(
         self,
         plotName: str = "",
@@ -296,8 +338,9 @@ class Comparison:
         ratioTitle: str = "Ratio",
         fraction: float = 0.3,
         show_nonEmptyOnly: bool = True,
+        autoClose: bool = False,
     ):
-        self.canvas = canvas(plotName)
+        self.canvas = canvas(plotName, autoClose=autoClose)
 
         self.mainPad = pad(
             "main", yl=fraction, configPath=loader.path() + "configs/pad_dm.json"
@@ -315,6 +358,8 @@ class Comparison:
         self.ratioPad.set_title(xTitle, ratioTitle)
 
         self.nonEmpty = show_nonEmptyOnly
+        # bins with content not above are treated as empty
+        self.emptyThreshold = 0.0
         self.custom_xrange = None
 
     def add_and_plot(self, histos: List[histo]):
@@ -371,33 +416,8 @@ class Comparison:
         self.ratioPad.update_range()
 
     def _xrange_emptysupressed(self):
-        """Determine x range containing nonzero"""  # TODO REVIEW
-        # reference
-        hist = self.histos[0]
-        xMin = hist.th.GetBinLowEdge(1)
-        xMax = hist.th.GetBinLowEdge(hist.th.GetNbinsX() + 1)
-        prevCont = False
-        minDone = False
-        maxDone = False
-        for i in range(hist.th.GetNbinsX()):
-            iBin = i + 1
-            if (
-                hist.th.GetBinContent(iBin) != 0
-            ):
-                minDone = True
-                prevCont = True
-                continue
-
-            if not minDone:
-                xMin = hist.th.GetBinLowEdge(iBin + 1)
-            if prevCont:
-                xMax = hist.th.GetBinLowEdge(iBin)
-                maxDone = True
-            prevCont = False
-        if not maxDone:
-            xMax = hist.th.GetBinLowEdge(hist.th.GetNbinsX() + 1)
-
-        return (xMin, xMax)
+        """Determine x range containing nonzero reference histogram"""
+        return thHelper.nonempty_xrange([self.histos[0].th], self.emptyThreshold)
 
     def set_xrange(self, min, max):
         self.custom_xrange = True
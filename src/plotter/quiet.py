@@ -1,4 +1,4 @@
-import ROOT
+from ._root import ROOT
 
 
 class Quiet:
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Hashable, Optional, Tuple
+
+from .npbackend import NumpyHist
+from . import thHelper
+
+if TYPE_CHECKING:
+    from ROOT import TH1
+
+import logging
+
+log = logging.getLogger(__name__)
+
+
+def _nbytes(th: Any) -> int:
+    """Approximate memory used by bin arrays of the histogram"""
+    if isinstance(th, NumpyHist):
+        return th.contents.nbytes + (0 if th.sumw2 is None else th.sumw2.nbytes)
+    try:
+        nbytes = thHelper.get_contents_view(th).nbytes
+    except TypeError:
+        # profiles, contents + entries + sum of weights squared
+        return 3 * 8 * th.GetNcells()
+    sumw2 = thHelper.get_sumw2_view(th)
+    return nbytes + (0 if sumw2 is None else sumw2.nbytes)
+
+
+def _copy(th: Any) -> Any:
+    """Returns independent copy of the histogram owned by python"""
+    clone = th.Clone()
+    if not isinstance(th, NumpyHist):
+        from ._root import ROOT
+
+        clone.SetDirectory(0)
+        # otherwise the clone would never be deleted
+        ROOT.SetOwnership(clone, True)
+    return clone
+
+
+class ResultCache:
+    """Memory-bounded LRU cache of combined histograms
+
+    Used by collection and SuperCollection.get_th, so collections
+    shared by several SuperCollections are read and normalized only
+    once. Entries are copied both when stored and when returned,
+    so the cached histograms can never be modified by the caller.
+
+    Keys describe content of the collection (datasets, their
+    cross-sections and luminosities, scale factors), changes of the
+    input files on disk are not tracked, use `clear()` in such case.
+    """
+
+    def __init__(self, maxBytes: int = 256 * 1024 * 1024) -> None:
+        """
+        Arguments:
+            maxBytes (``int``): memory budget for the bin arrays
+                of cached histograms, 0 disables the cache
+        """
+        self.maxBytes = maxBytes
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self.nbytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[TH1]:
+        """Returns copy of the cached histogram, None if not cached"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return _copy(entry[0])
+
+    def put(self, key: Hashable, th: Optional[TH1]) -> None:
+        """Stores copy of the histogram, evicting least recently
+        used entries if the budget is exceeded"""
+        if th is None or self.maxBytes <= 0 or not th.InheritsFrom("TH1"):
+            return
+        nbytes = _nbytes(th)
+        if nbytes > self.maxBytes:
+            log.debug(f"Histogram {th.GetName()} exceeds budget of the result cache")
+            return
+
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= old[1]
+        self._entries[key] = (_copy(th), nbytes)
+        self.nbytes += nbytes
+        self._shrink(self.maxBytes)
+
+    def _shrink(self, maxBytes: int) -> None:
+        """Drops least recently used entries until at most `maxBytes` are used"""
+        while self._entries and self.nbytes > maxBytes:
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self.nbytes -= nbytes
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drops all cached histograms"""
+        self._entries.clear()
+        self.nbytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Returns counters useful to tune `maxBytes`"""
+        return {
+            "entries": len(self._entries),
+            "bytes": self.nbytes,
+            "maxBytes": self.maxBytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
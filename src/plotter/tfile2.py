@@ -1,5 +1,5 @@
 from ROOT import TFile
-import ROOT
+from ._root import ROOT
 
 
 class TFile2(TFile):
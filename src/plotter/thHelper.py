@@ -1,8 +1,15 @@
-from ROOT import TH1, TGraph
-import ROOT
+from __future__ import annotations
+
 from array import array
-from math import sqrt
-from typing import List
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .npbackend import NumpyHist
+
+if TYPE_CHECKING:
+    from ROOT import TH1, TGraph, TAxis
 
 import logging
 
@@ -12,13 +19,149 @@ log = logging.getLogger(__name__)
 
 divide_ratio: divide function where error of the denominator
     is not takein into account.
+get_errors2: squared bin errors as numpy array.
+rebin: rebinning with cached plans (see get_rebin_plan).
+parse_binning/reduce_binning: binning definitions shared by histo.rebin
+    and collection.get_th.
+stack_cumulative: stack of histograms from one cumulative sum.
+nonempty_xrange: x range of non-empty bins of several histograms.
+get_extrema: minimum/maximum of a histogram or graph within x range.
+make_frame: empty histogram with axes of a histogram/graph, used as pad basis.
+get_contents_view/get_sumw2_view: numpy arrays sharing memory
+    with the histogram.
 """
 
+# numpy types of the internal arrays of TH1 classes
+_ARRAY_DTYPES = (
+    ("TArrayD", np.float64),
+    ("TArrayF", np.float32),
+    ("TArrayI", np.int32),
+    ("TArrayS", np.int16),
+    ("TArrayC", np.int8),
+    ("TArrayL64", np.int64),
+)
+
+
+class _ViewOwner:
+    """Array interface of a C++ buffer which also holds the object
+    owning the buffer, so the object is kept alive by numpy views"""
+
+    __slots__ = ("__array_interface__", "owner")
+
+    def __init__(self, array: np.ndarray, owner) -> None:
+        self.__array_interface__ = array.__array_interface__
+        self.owner = owner
+
+
+def _as_numpy(buffer, dtype, size: int, owner=None) -> np.ndarray:
+    """Wraps C++ buffer of known size into numpy array without copy,
+    the owner of the buffer (if given) is referenced by the array"""
+    if size == 0:
+        return np.zeros(0, dtype=dtype)
+    buffer.reshape((size,))
+    array = np.frombuffer(buffer, dtype=dtype, count=size)
+    if owner is None:
+        return array
+    return np.asarray(_ViewOwner(array, owner))
+
+
+def get_contents_view(th: TH1) -> np.ndarray:
+    """Returns bin contents of the histogram as numpy array
+    sharing memory with the histogram (changes are visible in both).
+    The array keeps the histogram alive.
+
+    The array is flat, includes under/overflow bins
+    and follows the ROOT global bin numbering. It is invalidated
+    by methods reallocating the bins (e.g. Rebin, SetBins),
+    get a new view after calling them.
+
+    Arguments:
+        th (``TH1``): target histogram, TProfile not supported
+    """
+    if th.InheritsFrom("TProfile") or th.InheritsFrom("TProfile2D"):
+        raise TypeError("Bin contents of profiles are not stored directly")
+    for arrayClass, dtype in _ARRAY_DTYPES:
+        if th.InheritsFrom(arrayClass):
+            return _as_numpy(th.GetArray(), dtype, th.GetNcells(), th)
+    raise TypeError(f"Unsupported histogram type {th.ClassName()}")
+
+
+def get_sumw2_view(th: TH1) -> Optional[np.ndarray]:
+    """Returns sum of weights squared of the histogram as numpy array
+    sharing memory with the histogram, None if not stored (see TH1::Sumw2).
+    The array keeps the histogram alive, it is invalidated by methods
+    reallocating the bins (e.g. Sumw2, Rebin, SetBins).
+
+    Arguments:
+        th (``TH1``): target histogram
+    """
+    if th.GetSumw2N() == 0:
+        return None
+    sumw2 = th.GetSumw2()
+    return _as_numpy(sumw2.GetArray(), np.float64, sumw2.GetSize(), th)
+
+
+def get_edges(axis: TAxis) -> np.ndarray:
+    """Returns bin edges of the axis
+
+    Arguments:
+        axis (``TAxis``): target axis
+    """
+    xbins = axis.GetXbins()
+    if xbins.GetSize():
+        return _as_numpy(xbins.GetArray(), np.float64, xbins.GetSize()).copy()
+    return np.linspace(axis.GetXmin(), axis.GetXmax(), axis.GetNbins() + 1)
+
+
+def _has_array_errors(th: TH1) -> bool:
+    """True if bin errors are given by the internal arrays
+    (sum of weights squared or sqrt of contents)"""
+    from ._root import ROOT
+
+    return not (
+        th.InheritsFrom("TProfile")
+        or th.InheritsFrom("TProfile2D")
+        or th.GetBinErrorOption() != ROOT.TH1.kNormal
+    )
+
+
+def get_errors2(th: TH1) -> np.ndarray:
+    """Returns copy of squared bin errors as flat numpy array
+    including under/overflow bins, same as TH1::GetBinError squared
+
+    Arguments:
+        th (``TH1``): target histogram, TProfile not supported
+    """
+    sumw2 = get_sumw2_view(th)
+    if sumw2 is not None:
+        return sumw2.copy()
+    return np.abs(get_contents_view(th).astype(np.float64))
+
+
+# number of statistics values for 1D, 2D and 3D histograms
+_N_STATS = {1: 4, 2: 7, 3: 11}
+
+
+def get_stats(th: TH1) -> np.ndarray:
+    """Returns statistics of the histogram as in TH1::GetStats
+    (sumw, sumw2, sumwx, sumwx2, ...)
+
+    Arguments:
+        th (``TH1``): target histogram
+    """
+    # 13 is the maximum size used by TH3
+    stats = np.zeros(13)
+    th.GetStats(stats)
+    return stats[: _N_STATS[th.GetDimension()]]
+
 
 def divide_ratio(numTH: TH1, denTH: TH1) -> None:
     """For ratio, we do not to take into account
     errors of the denominator!
 
+    Bins where the denominator is zero are set to zero,
+    under/overflow bins are divided as well.
+
     Arguments:
         numTH (``TH1``): histogram to be divided
             (numerator, modified)
@@ -28,12 +171,36 @@ def divide_ratio(numTH: TH1, denTH: TH1) -> None:
 
     # TODO: check compability of histogram!
     # for now only bin number
-    if numTH.GetNbinsX() != denTH.GetNbinsX():
+    if numTH.GetNbinsX() != denTH.GetNbinsX() or numTH.GetNcells() != denTH.GetNcells():
         log.error("Incompatible histograms!")
         raise ValueError
 
-    for i in range(numTH.GetNbinsX()):
-        iBin = i + 1
+    if not _has_array_errors(numTH) or denTH.InheritsFrom("TProfile"):
+        _divide_ratio_bins(numTH, denTH)
+        return
+
+    den = get_contents_view(denTH).astype(np.float64)
+    nonZero = den != 0
+    inverse = np.divide(1.0, den, out=np.zeros_like(den), where=nonZero)
+
+    errors2 = get_errors2(numTH)
+    if numTH.GetSumw2N() == 0:
+        numTH.Sumw2()
+    contents = get_contents_view(numTH)
+    sumw2 = get_sumw2_view(numTH)
+    assert sumw2 is not None
+
+    entries = numTH.GetEntries()
+    contents[:] = contents * inverse
+    sumw2[:] = errors2 * inverse * inverse
+    numTH.ResetStats()
+    numTH.SetEntries(entries)
+
+
+def _divide_ratio_bins(numTH: TH1, denTH: TH1) -> None:
+    """divide_ratio bin by bin, for histograms with
+    errors not given by the internal arrays (e.g. TProfile)"""
+    for iBin in range(numTH.GetNbinsX() + 2):
         otherVal = denTH.GetBinContent(iBin)
 
         # to divide the value has to be non-zero:
@@ -41,7 +208,6 @@ def divide_ratio(numTH: TH1, denTH: TH1) -> None:
             newVal = numTH.GetBinContent(iBin) / otherVal
             newErr = numTH.GetBinError(iBin) / otherVal
         # otherwise we set content to 0
-        # TODO: issue a warning? debug?
         else:
             newVal = 0
             newErr = 0
@@ -50,13 +216,64 @@ def divide_ratio(numTH: TH1, denTH: TH1) -> None:
         numTH.SetBinError(iBin, newErr)
 
 
-def rebin(TH: ROOT.TH1, binning: List[float], norm_by_width: bool = False) -> ROOT.TH1:
+# compiled rebinning plans by (source edges, target edges)
+_REBIN_PLANS: "OrderedDict[Tuple[bytes, bytes], np.ndarray]" = OrderedDict()
+_MAX_REBIN_PLANS = 256
+
+
+def get_rebin_plan(oldEdges: np.ndarray, newEdges: np.ndarray) -> np.ndarray:
+    """Returns global bin of the new binning for each global bin
+    of the old binning (under/overflow included). Plans are cached,
+    so applying the same binning to many histograms is cheap.
+
+    Arguments:
+        oldEdges (``np.ndarray``): bin edges of the source histogram
+        newEdges (``np.ndarray``): bin edges of the target histogram,
+            each has to match one of the old edges
+    """
+    key = (oldEdges.tobytes(), newEdges.tobytes())
+    plan = _REBIN_PLANS.get(key)
+    if plan is not None:
+        _REBIN_PLANS.move_to_end(key)
+        return plan
+
+    # each new edge has to be close to the nearest old edge,
+    # tolerance is 1/1000 of the width of the bin starting at the old edge
+    widths = np.diff(oldEdges)
+    epsilon = np.append(widths, widths[-1]) / 1000
+    upper = np.clip(np.searchsorted(oldEdges, newEdges), 0, len(oldEdges) - 1)
+    lower = np.clip(upper - 1, 0, len(oldEdges) - 1)
+    nearest = np.where(
+        np.abs(oldEdges[lower] - newEdges) <= np.abs(oldEdges[upper] - newEdges), lower, upper
+    )
+    if not np.all(np.abs(oldEdges[nearest] - newEdges) < epsilon[nearest]):
+        raise RuntimeError(
+            'Provided binning does not match '
+            'bins of the current histogram and rebinning is not possible! '
+            'New bins have to be combinations of bins the original '
+            'histogram.'
+        )
+
+    # same as TH1::FindBin of the old bin centers, flows go to flows
+    centers = (oldEdges[:-1] + oldEdges[1:]) / 2
+    inner = np.searchsorted(newEdges, centers, side="right")
+    plan = np.concatenate(([0], inner, [len(newEdges)]))
+
+    _REBIN_PLANS[key] = plan
+    if len(_REBIN_PLANS) > _MAX_REBIN_PLANS:
+        _REBIN_PLANS.popitem(last=False)
+    return plan
+
+
+def rebin(TH: TH1, binning: List[float], norm_by_width: bool = False) -> TH1:
     """Returns rebinned copy of histogram based on provided binning.
     Only 1D for now
     Arguments:
         binning (``list``): list of bin edges
         norm_by_width (``bool``): whether to normalize by bin width
     """
+    from ._root import ROOT
+
     name = "Rebin" + TH.GetName()
     # Supress warning for replacing histogram
     ignore_level = ROOT.gErrorIgnoreLevel
@@ -64,68 +281,283 @@ def rebin(TH: ROOT.TH1, binning: List[float], norm_by_width: bool = False) -> RO
     reb_hist = ROOT.TH1D(name, name, len(binning) - 1, array('d', binning))
     ROOT.gErrorIgnoreLevel = ignore_level
     reb_hist.Sumw2()
-    # check binning compatibility
-    for n in range(reb_hist.GetNbinsX() + 1):
-        new_edge = reb_hist.GetBinLowEdge(n + 1)
-        found_edge = False
-        for o in range(TH.GetNbinsX() + 1):
-            oldEdge = TH.GetBinLowEdge(o + 1)
-            epsilon = TH.GetBinWidth(o + 1) / 1000
-            if abs(oldEdge - new_edge) < epsilon:
-                found_edge = True
-        if not found_edge:
-            raise RuntimeError(
-                'Provided binning does not match '
-                'bins of the current histogram and rebinning is not possible! '
-                'New bins have to be combinations of bins the original '
-                'histogram.'
-            )
-    for old_bin in range(TH.GetNbinsX() + 2):
-        new_bin = reb_hist.FindBin(TH.GetBinCenter(old_bin))
-        reb_hist.SetBinContent(
-            new_bin, TH.GetBinContent(old_bin) + reb_hist.GetBinContent(new_bin)
-        )
-        error = TH.GetBinError(old_bin) ** 2 + reb_hist.GetBinError(new_bin) ** 2
-        reb_hist.SetBinError(new_bin, sqrt(error))
+
+    plan = get_rebin_plan(
+        get_edges(TH.GetXaxis()), np.asarray(binning, dtype=np.float64)
+    )
+    if _has_array_errors(TH):
+        contents = get_contents_view(TH).astype(np.float64)
+        errors2 = get_errors2(TH)
+    else:
+        nCells = TH.GetNbinsX() + 2
+        contents = np.array([TH.GetBinContent(i) for i in range(nCells)])
+        errors2 = np.array([TH.GetBinError(i) ** 2 for i in range(nCells)])
+
+    nNew = reb_hist.GetNcells()
+    get_contents_view(reb_hist)[:] = np.bincount(plan, contents, nNew)
+    sumw2 = get_sumw2_view(reb_hist)
+    assert sumw2 is not None
+    sumw2[:] = np.bincount(plan, errors2, nNew)
+    reb_hist.ResetStats()
+    reb_hist.SetEntries(TH.GetEntries())
+
     if norm_by_width:
         reb_hist.Scale(1, "width")
     return reb_hist
 
 
-def divide_ratio_graph(num: TGraph, den: TGraph) -> None:
+def _graph_array(buffer, size: int) -> np.ndarray:
+    """Returns copy of the first size points of a TGraph array"""
+    return _as_numpy(buffer, np.float64, size).copy()
+
+
+def stack_cumulative(
+    ths: List[TH1], targets: Optional[List[Optional[TH1]]] = None
+) -> None:
+    """Creates stack of histograms, i-th stacked histogram is the sum
+    of histograms i, i+1, ... (the first one is the total).
+
+    Contents, squared errors, statistics and entries are summed
+    as by TH1::Add, using one cumulative sum over all histograms.
+
+    Arguments:
+        ths (``List[TH1]``): histograms with the same binning
+        targets (``List[TH1]``): histograms with the same binning where
+            the stacked histograms are written, None entries are skipped.
+            By default the stack is written into `ths`.
+    """
+    if targets is None:
+        targets = list(ths)
+    if not all(_has_array_errors(th) for th in ths) or len(
+        {th.GetNcells() for th in ths + [t for t in targets if t is not None]}
+    ) != 1:
+        _stack_cumulative_bins(ths, targets)
+        return
+
+    def reverse_cumsum(rows: List[np.ndarray]) -> np.ndarray:
+        return np.cumsum(np.stack(rows)[::-1], axis=0)[::-1]
+
+    contents = reverse_cumsum([get_contents_view(th).astype(np.float64) for th in ths])
+    errors2 = reverse_cumsum([get_errors2(th) for th in ths])
+    stats = reverse_cumsum([get_stats(th) for th in ths])
+    entries = np.cumsum([th.GetEntries() for th in ths][::-1])[::-1]
+    for i, th in enumerate(targets):
+        if th is None:
+            continue
+        if th.GetSumw2N() == 0:
+            th.Sumw2()
+        get_contents_view(th)[:] = contents[i]
+        sumw2 = get_sumw2_view(th)
+        assert sumw2 is not None
+        sumw2[:] = errors2[i]
+        th.PutStats(stats[i])
+        th.SetEntries(entries[i])
+
+
+def _stack_cumulative_bins(ths: List[TH1], targets: List[Optional[TH1]]) -> None:
+    """stack_cumulative with TH1::Add, for histograms with
+    errors not given by the internal arrays (e.g. TProfile)"""
+    total = None
+    for th, target in zip(reversed(ths), reversed(targets)):
+        if total is None:
+            total = th.Clone()
+        else:
+            total.Add(th)
+        if target is not None:
+            target.Reset()
+            target.Add(total)
+
+
+def _inner_contents(th: TH1) -> np.ndarray:
+    """Contents of 1D histogram without under/overflow bins"""
+    try:
+        return get_contents_view(th)[1:-1]
+    except TypeError:
+        return np.array([th.GetBinContent(i + 1) for i in range(th.GetNbinsX())])
+
+
+def nonempty_xrange(ths: List[TH1], threshold: float = 0) -> Tuple[float, float]:
+    """Returns x range from the low edge of the first to the upper edge
+    of the last bin where any of the histograms is not empty.
+    Full range of the first histogram is returned if all bins are empty.
+
+    Arguments:
+        ths (``List[TH1]``): 1D histograms with the same binning
+        threshold (``float``): bins with absolute content not above
+            the threshold are considered empty
+    """
+    edges = get_edges(ths[0].GetXaxis())
+    filled = np.zeros(len(edges) - 1, dtype=bool)
+    for th in ths:
+        filled |= np.abs(_inner_contents(th)) > threshold
+    indices = np.flatnonzero(filled)
+    if len(indices) == 0:
+        return (float(edges[0]), float(edges[-1]))
+    return (float(edges[indices[0]]), float(edges[indices[-1] + 1]))
+
+
+BinningType = Union[int, List[Union[float, Tuple[int, float]]]]
+
+
+def _edges_from_tuple(
+    edges: List[float], binning: List[Tuple[int, float]], xmax: float
+) -> List[float]:
+    for bindef in binning:
+        (nbins, width) = bindef
+        for i in range(nbins):
+            w = edges[-1] + width
+            if w <= xmax:
+                edges.append(w)
+            else:
+                log.warning(
+                    "Rebinning requires either int or list, got binning that exceeds histogram range"
+                )
+    last_edge = edges[-1]
+    if last_edge < xmax:
+        edges.append(xmax)
+    return edges
+
+
+def parse_binning(binning: BinningType, xmax: float) -> Union[int, List[float]]:
+    """Converts definition of the binning to number of merged bins or bin edges
+
+    - If variable is int it is number of bins to be merged (so TH1::Rebin)
+    - If it is a list
+       - if it is list of numbers it defines bin edges
+       - if the format is [xmin, (nbins, width), ...] each tuple defines
+         nbins bins of given width, up to xmax
+    Arguments:
+        binning (``Union[int, List[Union[float, tuple]]]``): binning definition
+        xmax (``float``): upper edge of the histogram
+    """
+
+    if isinstance(binning, int):
+        return binning
+
+    # binning [xmin, x1, x2, ... ]
+    if isinstance(binning, list) and all(isinstance(x, float) for x in binning):
+
+        if len(binning) < 2:
+            log.error("Rebinning requires either int or list, got empty list")
+            raise ValueError(
+                "Rebinning requires either int or list, got empty list"
+            )
+
+        return binning  # type: ignore
+
+    # binning [ xmin, {nbinx, width}, {nbinx,width}, ...]
+    if (
+        isinstance(binning, list)
+        and isinstance(binning[0], (float, int))
+        and all(isinstance(x, tuple) for x in binning[1:])
+    ):
+        return _edges_from_tuple([binning[0]], binning[1:], xmax)  # type: ignore
+
+    raise ValueError(
+        f"Binning {binning} does not have correct format, has to be either:\n"
+        " - int\n"
+        " - list of numbers\n"
+        " - list of float + tuples (number of bins, bin width)"
+    )
+
+
+def reduce_binning(
+    th: TH1,
+    binning: Optional[BinningType] = None,
+    xrange: Optional[Tuple[float, float]] = None,
+) -> TH1:
+    """Rebins histogram and/or restricts it to a range of x
+
+    Returns new histogram, except for int binning of TH1 which
+    merges bins in place (TH1::Rebin). Contents outside of the
+    x range are moved to under/overflow bins.
+
+    Arguments:
+        th (``TH1``): 1D histogram, TH1 or NumpyHist
+        binning (``Union[int, List[Union[float, tuple]]]``): new binning,
+            see parse_binning, None to keep the binning
+        xrange (``Tuple[float, float]``): range of x to be kept, matched
+            to the closest bin edges inside it, None to keep full range
+    """
+    isNumpy = isinstance(th, NumpyHist)
+
+    def edges_of(hist) -> np.ndarray:
+        return hist.edges[0] if isNumpy else get_edges(hist.GetXaxis())
+
+    if binning is not None:
+        edges = edges_of(th)
+        newBinning = parse_binning(binning, edges[-1])
+        if not isinstance(newBinning, int):
+            th = th.rebin(newBinning) if isNumpy else rebin(th, newBinning)
+        elif isNumpy:
+            # same as TH1::Rebin, remaining bins go to overflow
+            nBins = (len(edges) - 1) // newBinning * newBinning
+            th = th.rebin(edges[: nBins + 1: newBinning])
+        else:
+            th.Rebin(newBinning)
+
+    if xrange is not None:
+        edges = edges_of(th)
+        epsilon = np.append(np.diff(edges), edges[-1] - edges[-2]) / 1000
+        inside = (edges > xrange[0] - epsilon) & (edges < xrange[1] + epsilon)
+        if np.count_nonzero(inside) < 2:
+            log.error(f"Range {xrange} does not contain any bin of {th.GetName()}")
+            raise ValueError(f"Range {xrange} does not contain any bin")
+        newEdges = edges[inside]
+        th = th.rebin(newEdges) if isNumpy else rebin(th, list(newEdges))
+
+    return th
+
+
+def divide_ratio_graph(num: TGraph, den: TGraph) -> TGraph:
     """ For ratio, we do not to take into account
     errors of the denominator!
 
+    Points are matched by their index, points where the denominator
+    is zero (or missing) are dropped. The ratio is a new graph of the same
+    type, name and style as the numerator.
+
     Arguments:
-        numTH (``TGraph``): histogram to be divided
-            (numerator, modified)
-        denTH (``TGraph``): histogram to be divided by
+        num (``TGraph``): graph to be divided
+            (numerator, unchanged)
+        den (``TGraph``): graph to be divided by
             (denominator, unchanged)
+
+    Returns:
+        ratio (``TGraph``): ratio graph
     """
+    from ._root import ROOT
+
     size = min(num.GetN(), den.GetN())
-    dRem = 0  # accounts for removed points (points where den=0)
-
-    for i in range(size):
-        errUp = 0
-        errDo = 0
-        val = 0
-        denVal = den.GetY()[i-dRem]
-        if denVal != 0:
-            val = num.GetY()[i-dRem] / denVal
-            if num.InheritsFrom("TGraphAsymmErrors"):
-                errUp = num.GetErrorYhigh(i-dRem) / denVal
-                errDo = num.GetErrorYlow(i-dRem) / denVal
-            elif num.InheritsFrom("TGraphErrors"):
-                errUp = num.GetErrorYhigh(i-dRem) / denVal
-            num.SetPoint(i, num.GetX()[i-dRem], val)
-            if num.InheritsFrom("TGraphAsymmErrors"):
-                num.SetPointEYhigh(i-dRem, errUp)
-                num.SetPointEYlow(i-dRem, errDo)
-            elif num.InheritsFrom("TGraphErrors"):
-                num.SetPointError(i, num.GetErrorXhigh(i-dRem), errUp)
-        else:
-            num.RemovePoint(i-dRem)
-            dRem += 1
+    denY = _graph_array(den.GetY(), size)
+    keep = denY != 0
+    denY = denY[keep]
+
+    def points(buffer) -> np.ndarray:
+        return _graph_array(buffer, size)[keep]
+
+    arrays = [points(num.GetX()), points(num.GetY()) / denY]
+    if num.InheritsFrom("TGraphAsymmErrors"):
+        graphClass = ROOT.TGraphAsymmErrors
+        arrays += [
+            points(num.GetEXlow()), points(num.GetEXhigh()),
+            points(num.GetEYlow()) / denY, points(num.GetEYhigh()) / denY,
+        ]
+    elif num.InheritsFrom("TGraphErrors"):
+        graphClass = ROOT.TGraphErrors
+        arrays += [points(num.GetEX()), points(num.GetEY()) / denY]
+    else:
+        graphClass = ROOT.TGraph
+
+    n = len(denY)
+    ratio = graphClass(n, *arrays) if n else graphClass()
+
+    ratio.SetName(num.GetName())
+    ratio.SetTitle(num.GetTitle())
+    ROOT.TAttLine.Copy(num, ratio)
+    ROOT.TAttFill.Copy(num, ratio)
+    ROOT.TAttMarker.Copy(num, ratio)
+    return ratio
 
 
 def get_graph_minimum(g: TGraph) -> float:
@@ -134,9 +566,7 @@ def get_graph_minimum(g: TGraph) -> float:
     Arguments:
         g (``TGraph``):  target graph
     """
-    if g.GetN() == 0:
-        return -1111
-    return min(g.GetY())
+    return _graph_extrema(g, None, None)[0]
 
 
 def get_graph_maximum(g: TGraph) -> float:
@@ -145,13 +575,146 @@ def get_graph_maximum(g: TGraph) -> float:
     Arguments:
         g (``TGraph``):  target graph
     """
-    if g.GetN() == 0:
-        return -1111
-    return max(g.GetY())
+    return _graph_extrema(g, None, None)[2]
+
+
+# value returned by TH1::GetMinimum/GetMaximum when no bin qualifies
+_FLT_MAX = float(np.finfo(np.float32).max)
+
+
+def _bin_range(th: TH1, xMin: Optional[float], xMax: Optional[float]) -> Tuple[int, int]:
+    """First and last bin overlapping [xMin, xMax] and the axis range of the histogram"""
+    axis = th.GetXaxis()
+    first, last = axis.GetFirst(), axis.GetLast()
+    if xMin is None and xMax is None:
+        return first, last
+    edges = get_edges(axis)
+    if xMin is not None:
+        first = max(first, int(np.searchsorted(edges, xMin, side="right")))
+    if xMax is not None:
+        last = min(last, int(np.searchsorted(edges, xMax, side="left")))
+    return first, last
+
+
+def _graph_extrema(
+    g: TGraph, xMin: Optional[float], xMax: Optional[float]
+) -> Tuple[float, float, float]:
+    n = g.GetN()
+    y = _as_numpy(g.GetY(), np.float64, n)
+    if xMin is not None or xMax is not None:
+        x = _as_numpy(g.GetX(), np.float64, n)
+        inside = np.ones(n, dtype=bool)
+        if xMin is not None:
+            inside &= x >= xMin
+        if xMax is not None:
+            inside &= x <= xMax
+        y = y[inside]
+    if len(y) == 0:
+        return (-1111, -1111, -1111)
+    positive = y[y > 0]
+    minPositive = float(positive.min()) if len(positive) else _FLT_MAX
+    return (float(y.min()), minPositive, float(y.max()))
+
+
+def get_extrema(
+    th: Union[TH1, TGraph], xMin: Optional[float] = None, xMax: Optional[float] = None
+) -> Tuple[float, float, float]:
+    """Returns (minimum, minimum above zero, maximum) as given
+    by TH1::GetMinimum(), GetMinimum(0) and GetMaximum(), but only
+    bins overlapping [xMin, xMax] are considered. For graphs
+    points with x inside the range are used, -1111 if there are none.
+
+    Arguments:
+        th (``Union[TH1, TGraph]``): histogram or graph
+        xMin (``float``): lower limit of the x range, None for no limit
+        xMax (``float``): upper limit of the x range, None for no limit
+    """
+    if th.InheritsFrom("TGraph"):
+        return _graph_extrema(th, xMin, xMax)
+
+    if th.GetDimension() != 1 or th.InheritsFrom("TProfile"):
+        return (th.GetMinimum(), th.GetMinimum(0), th.GetMaximum())
+
+    first, last = _bin_range(th, xMin, xMax)
+    contents = get_contents_view(th)[first:last + 1]
+    if len(contents):
+        minimum = float(contents.min())
+        maximum = float(contents.max())
+        positive = contents[contents > 0]
+        minPositive = float(positive.min()) if len(positive) else _FLT_MAX
+    else:
+        minimum, minPositive, maximum = _FLT_MAX, _FLT_MAX, -_FLT_MAX
+
+    # values set by TH1::SetMinimum/SetMaximum take precedence
+    if th.GetMinimumStored() != -1111:
+        minimum = minPositive = th.GetMinimumStored()
+    if th.GetMaximumStored() != -1111:
+        maximum = th.GetMaximumStored()
+    return (minimum, minPositive, maximum)
+
+
+# frames need no contents, one byte per bin is enough
+_FRAME_CLASSES = {1: "TH1C", 2: "TH2C", 3: "TH3C"}
+
+
+def _axes(th: TH1, dimension: Optional[int] = None) -> List[TAxis]:
+    if dimension is None:
+        dimension = th.GetDimension()
+    return [th.GetXaxis(), th.GetYaxis(), th.GetZaxis()][:dimension]
+
+
+def _same_binning(th: TH1, other: TH1) -> bool:
+    if th.GetDimension() != other.GetDimension():
+        return False
+    return all(
+        np.array_equal(get_edges(axis), get_edges(otherAxis))
+        for axis, otherAxis in zip(_axes(th), _axes(other))
+    )
+
+
+def make_frame(th: Union[TH1, TGraph], frame: Optional[TH1] = None) -> TH1:
+    """Returns empty histogram with binning, labels, titles, ranges
+    and attributes of axes of the histogram or of the frame of the graph.
+    Unlike a reset clone it does not copy contents, errors or points.
+
+    Arguments:
+        th (``Union[TH1, TGraph]``): histogram or graph defining the axes
+        frame (``TH1``): frame from previous call, reused and returned
+            if it has the same binning
+    """
+    from ._root import ROOT
+
+    if th.InheritsFrom("TGraph"):
+        th = th.GetHistogram()
+
+    if frame is None or not _same_binning(th, frame):
+        args: List[Union[int, np.ndarray]] = []
+        for axis in _axes(th):
+            edges = get_edges(axis)
+            args += [len(edges) - 1, edges]
+        frame = getattr(ROOT, _FRAME_CLASSES[th.GetDimension()])("basis", th.GetTitle(), *args)
+        frame.SetDirectory(0)
+        frame.Sumw2(False)
+    else:
+        frame.SetTitle(th.GetTitle())
+
+    # unused axes have one bin in both, so all three can be copied,
+    # TAxis::Copy also copies the parent which has to be restored
+    for axis, frameAxis in zip(_axes(th, 3), _axes(frame, 3)):
+        axis.Copy(frameAxis)
+        frameAxis.SetParent(frame)
+    frame.SetMinimum(th.GetMinimumStored())
+    frame.SetMaximum(th.GetMaximumStored())
+    frame.SetStats(not th.TestBit(ROOT.TH1.kNoStats))
+    ROOT.TAttLine.Copy(th, frame)
+    ROOT.TAttFill.Copy(th, frame)
+    ROOT.TAttMarker.Copy(th, frame)
+    return frame
 
 
 def get_th1_error_as_hist(th1: TH1):
-    """Get error of the TH1 as two TH1s for up and down error
+    """Get error of the TH1 as two TH1s for up and down error,
+    under/overflow bins included
 
     Arguments:
         th1 (``TH1``): target TH1
@@ -166,7 +729,16 @@ def get_th1_error_as_hist(th1: TH1):
     th1_error_down = th1.Clone()
     th1_error_down.SetName(th1.GetName() + '_error_down')
     th1_error_down.Reset()
-    for i in range(1, th1.GetNbinsX()+1):
-        th1_error_up.SetBinContent(i, th1.GetBinContent(i) + th1.GetBinError(i))
-        th1_error_down.SetBinContent(i, th1.GetBinContent(i) - th1.GetBinError(i))
+
+    if not _has_array_errors(th1):
+        for i in range(th1.GetNbinsX() + 2):
+            th1_error_up.SetBinContent(i, th1.GetBinContent(i) + th1.GetBinError(i))
+            th1_error_down.SetBinContent(i, th1.GetBinContent(i) - th1.GetBinError(i))
+        return th1_error_up, th1_error_down
+
+    contents = get_contents_view(th1)
+    errors = np.sqrt(get_errors2(th1))
+    for hist, sign in ((th1_error_up, 1), (th1_error_down, -1)):
+        get_contents_view(hist)[:] = contents + sign * errors
+        hist.ResetStats()
     return th1_error_up, th1_error_down
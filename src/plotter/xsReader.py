@@ -1,4 +1,9 @@
-from typing import List, Dict
+import io
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+
+from . import cache
 
 import logging
 
@@ -20,9 +25,49 @@ class _xs:
         return self.get_xs() - other.get_xs() == 0
 
 
+# parsed content of one file: DSIDs, XS, k-factors, filter efficiencies
+_FileContent = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
 class xsReader:
-    def __init__(self) -> None:
-        self.XSsection: Dict[str, _xs] = {}
+    """Reader of PMG-style cross-section files
+
+    Lines are `DSID, XS, k-factor, filter efficiency, ...` with at least
+    7 columns. Values are stored in arrays (`dsids`, `XS`, `kFactor`,
+    `filtEff` and their product `xsTotal`) with a DSID to row index.
+
+    Parsed content of each file is cached on disk keyed by the path,
+    size and mtime of the file (see cache module for location of the
+    cache), warnings about `NULL` values are printed only when
+    the file is parsed.
+    """
+
+    def __init__(self, useCache: bool = True) -> None:
+        """
+        Arguments:
+            useCache (``bool``): if True, on-disk cache is used
+        """
+        self.useCache = useCache
+
+        self.dsids = np.empty(0, dtype=str)
+        self.XS = np.empty(0)
+        self.kFactor = np.empty(0)
+        self.filtEff = np.empty(0)
+        # product of the above, precomputed for lookups
+        self.xsTotal = np.empty(0)
+        self._index: Dict[str, int] = {}
+
+    @property
+    def XSsection(self) -> Dict[str, _xs]:
+        """DSID to _xs, created on request for backward compatibility"""
+        section = {}
+        for dsid, row in self._index.items():
+            xs = _xs()
+            xs.XS = float(self.XS[row])
+            xs.kFactor = float(self.kFactor[row])
+            xs.filtEff = float(self.filtEff[row])
+            section[dsid] = xs
+        return section
 
     def add_files(self, filePaths: List[str]):
         for filePath in filePaths:
@@ -36,38 +81,139 @@ class xsReader:
             return 1
         return float(new_str)
 
-    def add_file(self, filePath: str) -> None:
+    @staticmethod
+    def _parse_column(dsids: List[str], values: List[str], name: str) -> np.ndarray:
+        """Converts column to floats, `NULL` values are replaced by 1"""
+        try:
+            return np.array(values, dtype=str).astype(np.float64)
+        except ValueError:
+            return np.array(
+                [
+                    xsReader.string2float(f"DSID {dsid} {name}: ", value)
+                    for dsid, value in zip(dsids, values)
+                ]
+            )
+
+    @staticmethod
+    def _parse_file(filePath: str) -> _FileContent:
+        """Reads DSIDs and values of all valid lines of the file"""
         with open(filePath, "r") as xsFile:
-            for line in xsFile.readlines():
-                if line == "" or line[0] == "#" or "SampleID" in line:
+            lines = xsFile.read().splitlines()
+
+        rows = []
+        for line in lines:
+            if line == "" or line[0] == "#" or "SampleID" in line:
+                continue
+            split = line.split(",")
+            if len(split) >= 7:
+                rows.append(split)
+        dsids = [split[0].strip() for split in rows]
+        return (
+            np.array(dsids, dtype=str),
+            xsReader._parse_column(dsids, [split[1] for split in rows], "XS"),
+            xsReader._parse_column(dsids, [split[2] for split in rows], "k-factor"),
+            xsReader._parse_column(dsids, [split[3] for split in rows], "filter efficiency"),
+        )
+
+    @staticmethod
+    def _load_cached(filePath: str) -> Optional[_FileContent]:
+        """Loads parsed content of the file, None if missing or outdated"""
+        try:
+            signature = cache.file_signature(filePath)
+            with open(cache.cache_path("xsreader", signature[0], ".npz"), "rb") as f:
+                content = np.load(io.BytesIO(f.read()), allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+        if content["signature"].tolist() != [str(value) for value in signature]:
+            log.debug(f"Outdated cross-sections for {filePath}")
+            return None
+        return (content["dsids"], content["XS"], content["kFactor"], content["filtEff"])
+
+    @staticmethod
+    def _save_cached(filePath: str, content: _FileContent) -> None:
+        """Saves parsed content of the file to the cache"""
+        try:
+            signature = cache.file_signature(filePath)
+            buffer = io.BytesIO()
+            dsids, xs, kFactor, filtEff = content
+            np.savez(
+                buffer,
+                signature=np.array([str(value) for value in signature]),
+                dsids=dsids,
+                XS=xs,
+                kFactor=kFactor,
+                filtEff=filtEff,
+            )
+            cache.write_atomic(cache.cache_path("xsreader", signature[0], ".npz"), buffer.getvalue())
+        except OSError as e:
+            log.debug(f"Cannot save cross-sections for {filePath}: {e}")
+
+    def add_file(self, filePath: str) -> None:
+        content = self._load_cached(filePath) if self.useCache else None
+        if content is None:
+            content = self._parse_file(filePath)
+            if self.useCache:
+                self._save_cached(filePath, content)
+        self._add(*content)
+
+    def _add(self, dsids: np.ndarray, xs: np.ndarray, kFactor: np.ndarray, filtEff: np.ndarray) -> None:
+        """Appends new DSIDs, DSIDs already added are skipped
+        if they have the same XS, error is raised otherwise"""
+        xsTotal = xs * kFactor * filtEff
+        nOld = len(self.dsids)
+        index = dict(zip(dsids.tolist(), range(nOld, nOld + len(dsids))))
+
+        keep: Optional[List[int]] = None
+        # duplicates within the file or with already added files
+        if len(index) != len(dsids) or not index.keys().isdisjoint(self._index):
+            keep = []
+            index = {}
+            for i, dsid in enumerate(dsids.tolist()):
+                row = self._index.get(dsid, index.get(dsid))
+                if row is None:
+                    index[dsid] = nOld + len(keep)
+                    keep.append(i)
                     continue
-                split = line.split(",")
-                if len(split) < 7:
+                other = self.xsTotal[row] if row < nOld else xsTotal[keep[row - nOld]]
+                if other - xsTotal[i] == 0:
+                    log.warning(f"DSID {dsid} already in XSsection, skipping!")
                     continue
-                dsid = split[0].strip()
-                xs = _xs()
-                xs.XS = xsReader.string2float(f"DSID {dsid} XS: ", split[1])
-                xs.kFactor = xsReader.string2float(
-                    f"DSID {dsid} k-factor: ", split[2]
-                )
-                xs.filtEff = xsReader.string2float(
-                    f"DSID {dsid} filter efficiency: ", split[3]
-                )
-                if dsid in self.XSsection.keys():
-                    if self.XSsection[dsid] == xs:
-                        log.warning(f"DSID {dsid} already in XSsection, skipping!")
-                        continue
-                    else:
-                        log.error(f"DSID {dsid} already in XSsection and has different XS!")
-                        raise RuntimeError
-                self.XSsection[dsid] = xs
+                log.error(f"DSID {dsid} already in XSsection and has different XS!")
+                raise RuntimeError
+
+        self.dsids = np.concatenate([self.dsids, dsids if keep is None else dsids[keep]])
+        self.XS = np.concatenate([self.XS, xs if keep is None else xs[keep]])
+        self.kFactor = np.concatenate([self.kFactor, kFactor if keep is None else kFactor[keep]])
+        self.filtEff = np.concatenate([self.filtEff, filtEff if keep is None else filtEff[keep]])
+        self.xsTotal = np.concatenate([self.xsTotal, xsTotal if keep is None else xsTotal[keep]])
+        self._index.update(index)
 
     def get_xs(self, dsid: str, oneIfMissing: bool = False) -> float:
-        if dsid not in self.XSsection.keys():
+        row = self._index.get(dsid)
+        if row is None:
             if oneIfMissing:
                 log.warning(f"DSID {dsid} not in any of added files!")
                 log.warning("Returning 1")
                 return 1
             log.error(f"DSID {dsid} not in any of added files!")
             raise RuntimeError
-        return self.XSsection[dsid].get_xs()
+        return float(self.xsTotal[row])
+
+    def get_xs_many(self, dsids: List[str], oneIfMissing: bool = False) -> np.ndarray:
+        """Returns cross-sections of several DSIDs as array,
+        see get_xs for treatment of missing DSIDs
+
+        Arguments:
+            dsids (``List[str]``): DSIDs
+            oneIfMissing (``bool``): if True, 1 is returned for missing DSIDs
+        """
+        rows = np.array([self._index.get(dsid, -1) for dsid in dsids], dtype=np.int64)
+        missing = rows < 0
+        if missing.any():
+            for dsid in np.asarray(dsids)[missing]:
+                if not oneIfMissing:
+                    log.error(f"DSID {dsid} not in any of added files!")
+                    raise RuntimeError
+                log.warning(f"DSID {dsid} not in any of added files!")
+                log.warning("Returning 1")
+        return np.where(missing, 1.0, self.xsTotal[rows] if len(self.xsTotal) else 1.0)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+""" Guards memory usage of repeated plotting
+
+Renders and saves dataMC plots inside `with presets.dataMC(...)`,
+fails if the resident memory grows by more than the tolerance
+(MB, PLOTTER_MEMORY_TOLERANCE environment variable, 16 by default)
+between the end of the warm-up (first tenth of the plots) and the last
+plot, or if any canvas is left in gROOT.GetListOfCanvases().
+Number of plots is given by PLOTTER_MEMORY_PLOTS (1000 by default).
+
+Needs ROOT, unlike check_import_time.py.
+"""
+
+import os
+import resource
+import sys
+import tempfile
+
+N_PLOTS = int(os.environ.get("PLOTTER_MEMORY_PLOTS", "1000"))
+TOLERANCE = float(os.environ.get("PLOTTER_MEMORY_TOLERANCE", "16"))
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+
+def rss() -> float:
+    """Current resident memory in MB, peak if not available"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kB on Linux, bytes on macOS
+        return maxrss / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def main() -> int:
+    from plotter import presets, histo
+    from plotter._root import ROOT
+
+    th = ROOT.TH1D("mem_th", "", 50, 0, 100)
+    for i in range(1, 51):
+        th.SetBinContent(i, 100 + i)
+
+    warmUp = max(N_PLOTS // 10, 1)
+    start = 0.0
+    with tempfile.TemporaryDirectory() as tmpDir:
+        for i in range(N_PLOTS):
+            hData = histo("data", th)
+            hMCs = [histo("a", th, fillcolor=ROOT.kRed), histo("b", th, fillcolor=ROOT.kBlue)]
+            with presets.dataMC(f"plot{i}") as dm:
+                dm.add_and_plot(hData, hMCs)
+                dm.draw_legend()
+                dm.canvas.add_text("Memory check", 0.2, 0.8)
+                dm.save(os.path.join(tmpDir, "plot.png"))
+            if i + 1 == warmUp:
+                start = rss()
+
+    growth = rss() - start
+    nCanvases = len(ROOT.gROOT.GetListOfCanvases())
+    print(
+        f"{N_PLOTS} plots: memory grew by {growth:.1f} MB after warm-up "
+        f"(tolerance {TOLERANCE:.0f} MB), {nCanvases} canvases left"
+    )
+    return 0 if growth <= TOLERANCE and nCanvases == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+""" Guards startup time of the package
+
+Imports the package and its ROOT-free modules in a fresh interpreter,
+fails if ROOT gets imported or if the import takes longer than the budget
+(seconds, PLOTTER_IMPORT_BUDGET environment variable, 0.5 by default).
+The best of several runs is used to reduce noise.
+
+If uproot is installed, histograms are also read, normalized and merged
+by collection.get_th with the uproot backend, which must not import ROOT.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+BUDGET = float(os.environ.get("PLOTTER_IMPORT_BUDGET", "0.5"))
+RUNS = 5
+
+CODE = """
+import sys
+import time
+start = time.perf_counter()
+import plotter
+import plotter.cache
+import plotter.loader
+import plotter.pdgRounding
+import plotter.xsReader
+import plotter.yields
+print(time.perf_counter() - start, "ROOT" in sys.modules)
+"""
+
+UPROOT_CODE = """
+import os
+import sys
+import numpy as np
+import uproot
+import plotter
+
+tmpDir = sys.argv[1]
+os.environ["PLOTTER_CACHE_DIR"] = os.path.join(tmpDir, "cache")
+edges = np.linspace(0, 10, 11)
+paths = []
+for i in range(3):
+    paths.append(os.path.join(tmpDir, f"sample{i}.root"))
+    with uproot.recreate(paths[-1]) as f:
+        f["h"] = (np.arange(10.0) + i, edges)
+
+a = plotter.collection("a")
+b = plotter.collection("b")
+for i, path in enumerate(paths):
+    (a if i < 2 else b).add_dataset(plotter.dataset(f"s{i}", path, XS=2.0, backend="uproot"))
+top = plotter.SuperCollection("top", 0.5)
+top.add(a)
+top.add(b)
+norm = plotter.normalizationHelper(normByXS=True)
+th = top.get_th("h", norm, binning=2, xrange=(2, 8))
+assert th is not None and abs(th.Integral() - 99.0) < 1e-9, th.Integral()
+print("ROOT" in sys.modules)
+"""
+
+
+def check_uproot_path(env) -> int:
+    """Runs uproot-backed get_th, fails if it imports ROOT"""
+    try:
+        import uproot  # NOQA
+    except ImportError:
+        print("uproot not installed, skipping check of the uproot backend")
+        return 0
+    with tempfile.TemporaryDirectory() as tmpDir:
+        out = subprocess.run(
+            [sys.executable, "-c", UPROOT_CODE, tmpDir], env=env, check=True, capture_output=True, text=True
+        ).stdout.split()
+    if out[-1] == "True":
+        print("collection.get_th with uproot backend imports ROOT")
+        return 1
+    print("collection.get_th with uproot backend: ROOT not imported")
+    return 0
+
+
+def main() -> int:
+    src = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([src, os.environ.get("PYTHONPATH", "")]))
+
+    times = []
+    for _ in range(RUNS):
+        out = subprocess.run(
+            [sys.executable, "-c", CODE], env=env, check=True, capture_output=True, text=True
+        ).stdout.split()
+        if out[1] == "True":
+            print("import plotter imports ROOT")
+            return 1
+        times.append(float(out[0]))
+
+    best = min(times)
+    print(f"import plotter: {best * 1000:.1f} ms (budget {BUDGET * 1000:.0f} ms)")
+    if best > BUDGET:
+        return 1
+    return check_uproot_path(env)
+
+
+if __name__ == "__main__":
+    sys.exit(main())